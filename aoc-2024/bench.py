@@ -0,0 +1,218 @@
+"""
+Benchmark every day against synthetic inputs of growing size, and estimate how each part scales.
+
+Inputs come from `bench_inputs.py`, seeded per (seed, day, tier), so two runs with the same seed
+time exactly the same puzzles. A day stops escalating once a tier runs longer than `--budget`, or fails
+(besides the sample). The reported exponent `k` between two tiers is `log(t2 / t1) / log(n2 / n1)`, with `n`
+the input size, so ~1 is linear and ~2 is quadratic. Days without a `parts()` entry point (see `run.py`) are
+only timed as a whole, and reported as part `-`.
+"""
+import argparse
+import csv
+import json
+import math
+import random
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+from bench_inputs import GENERATORS
+from run import discover_days, run_day
+
+TIERS: dict[str, float | None] = {
+    'sample': None,
+    'puzzle': 1,
+    '10x': 10,
+    '100x': 100,
+}
+
+
+class TierResult:
+    day: int
+    tier: str
+    size: int
+    repeats: list[dict[int, float]]
+    totals: list[float]
+    values: dict[int, str]
+    error: str | None
+
+    def __init__(self, day: int, tier: str, size: int):
+        self.day = day
+        self.tier = tier
+        self.size = size
+        self.repeats = []
+        self.totals = []
+        self.values = {}
+        self.error = None
+
+    @property
+    def best(self):
+        return min(self.totals) if self.totals else math.nan
+
+    def part_times(self):
+        parts = sorted({part for times in self.repeats for part in times})
+        return {part: [times[part] for times in self.repeats if part in times] for part in parts}
+
+    def series(self):
+        """
+        Times per part, or of the whole day (part `None`) when the day doesn't time its parts on their own.
+        """
+        return self.part_times() or ({None: self.totals} if self.totals else {})
+
+
+def make_input(day: int, tier: str, seed: int, workdir: Path, day_dir: Path):
+    scale = TIERS[tier]
+    if scale is None:
+        return day_dir / 'sample.txt', []
+
+    generated = GENERATORS[day](random.Random(f'{seed}:{day}:{tier}'), scale)
+    if generated is None:
+        return None
+    text, argv = generated
+    path = workdir / f'day-{day:02d}-{tier}-{seed}.txt'
+    path.write_text(text, encoding='utf-8')
+    return path, argv
+
+
+def bench_day(day: int, tiers: list[str], seed: int, repeat: int, budget: float, workdir: Path,
+              days: dict[int, Path], trace_memory: bool = False):
+    results = []
+    for tier in tiers:
+        made = make_input(day, tier, seed, workdir, days[day].parent)
+        if made is None:
+            continue
+        path, argv = made
+
+        result = TierResult(day, tier, path.stat().st_size)
+        for _ in range(repeat):
+            run = run_day(day, path, argv, trace_memory, days)
+            if not run.ok:
+                result.error = run.error
+                break
+            result.totals.append(run.seconds)
+            result.repeats.append({part.part: part.seconds for part in run.parts if part.seconds is not None})
+            values = {part.part: part.value for part in run.parts}
+            if result.values and values != result.values:
+                result.error = f'unstable answers {result.values} != {values}'
+                break
+            result.values = values
+        results.append(result)
+
+        print(f'day {day:02} {tier:>6}: {result.best * 1000:.3f} ms {result.error or ""}', file=sys.stderr)
+        # A failing sample (day 24 only solves real inputs) doesn't say anything about the bigger tiers.
+        if (result.error and tier != 'sample') or result.best > budget:
+            break
+    return results
+
+
+def exponent(size1: int, time1: float, size2: int, time2: float):
+    if size1 == size2 or time1 <= 0 or time2 <= 0:
+        return None
+    return math.log(time2 / time1) / math.log(size2 / size1)
+
+
+def to_rows(results: list[TierResult]):
+    prev: dict[tuple[int, int | None], tuple[int, float]] = {}
+    for result in results:
+        for part, times in result.series().items():
+            best = min(times)
+            k = None
+            if (key := (result.day, part)) in prev:
+                k = exponent(*prev[key], result.size, best)
+            prev[key] = (result.size, best)
+            yield {
+                'day': result.day,
+                'tier': result.tier,
+                'part': part,
+                'size': result.size,
+                'best': best,
+                'median': statistics.median(times),
+                'exponent': k,
+                'value': result.values.get(part) if part else None,
+                'error': result.error,
+            }
+        if not result.totals:
+            yield {'day': result.day, 'tier': result.tier, 'part': None, 'size': result.size, 'best': None,
+                   'median': None, 'exponent': None, 'value': None, 'error': result.error}
+
+
+def write_report(results: list[TierResult], fmt: str, out=sys.stdout):
+    rows = list(to_rows(results))
+    if fmt == 'json':
+        json.dump(rows, out, indent=2)
+        out.write('\n')
+    elif fmt == 'csv':
+        writer = csv.DictWriter(out, fieldnames=list(rows[0]) if rows else ['day'])
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        out.write(f'{"day":>3} {"tier":>6} {"part":>4} {"bytes":>10} {"best (ms)":>12} {"median (ms)":>12} {"k":>6}\n')
+        for row in rows:
+            if row['best'] is None:
+                out.write(f'{row["day"]:>3} {row["tier"]:>6} {"-":>4} {row["size"]:>10}  !! {row["error"]}\n')
+                continue
+            k = '-' if row['exponent'] is None else f'{row["exponent"]:.2f}'
+            out.write(f'{row["day"]:>3} {row["tier"]:>6} {row["part"] or "-":>4} {row["size"]:>10} '
+                      f'{row["best"] * 1000:>12.3f} {row["median"] * 1000:>12.3f} {k:>6}'
+                      f'{"  !! " + row["error"] if row["error"] else ""}\n')
+
+
+def plot(results: list[TierResult], path: str):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    curves: dict[tuple[int, int | None], list[tuple[int, float]]] = {}
+    for result in results:
+        for part, times in result.series().items():
+            curves.setdefault((result.day, part), []).append((result.size, min(times)))
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    for (day, part), points in sorted(curves.items(), key=lambda item: (item[0][0], item[0][1] or 0)):
+        if len(points) > 1:
+            ax.plot(*zip(*points), marker='o', label=f'day {day:02} ' + (f'p{part}' if part else 'total'))
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlabel('input size (bytes)')
+    ax.set_ylabel('best time (s)')
+    ax.legend(ncol=4, fontsize='small')
+    fig.savefig(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("days", nargs="*", type=int, help="Days to benchmark (default: all)")
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=list(TIERS))
+    parser.add_argument("-s", "--seed", type=int, default=2024)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-b", "--budget", type=float, default=30, help="Don't go to the next tier after this (seconds)")
+    parser.add_argument("-w", "--workdir", help="Keep generated inputs in this directory")
+    parser.add_argument("-m", "--memory", action="store_true", help="Trace peak memory (slower)")
+    parser.add_argument("-f", "--format", choices=("table", "csv", "json"), default="table")
+    parser.add_argument("-o", "--output", help="Write the report to a file instead of stdout")
+    parser.add_argument("--plot", help="Save a log-log plot of the scaling curves")
+    args = parser.parse_args()
+
+    days = discover_days()
+    tiers = [tier for tier in TIERS if tier in args.tiers]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir or tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        results = []
+        for day in args.days or list(days):
+            results += bench_day(day, tiers, args.seed, args.repeat, args.budget, workdir, days, args.memory)
+
+    if args.output:
+        with open(args.output, "w", encoding='utf-8', newline='') as file:
+            write_report(results, args.format, file)
+    else:
+        write_report(results, args.format)
+
+    if args.plot:
+        plot(results, args.plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+"""
+Deterministic synthetic puzzle inputs for every day, following each day's input grammar.
+
+A generator takes a seeded `random.Random` and a scale, where scale 1 is roughly the size of a real
+puzzle input, and returns the input text with the extra command line arguments the day needs,
+or `None` when the day can not be scaled that far.
+Grid puzzles scale their area, list puzzles scale their line count.
+"""
+import math
+import random
+import string
+from typing import Callable
+
+type Generated = tuple[str, list[str]] | None
+type Generator = Callable[[random.Random, float], Generated]
+
+GENERATORS: dict[int, Generator] = {}
+
+
+def generator(day: int):
+    def register(fn: Generator):
+        GENERATORS[day] = fn
+        return fn
+
+    return register
+
+
+def scaled(base: int, scale: float) -> int:
+    return max(1, round(base * scale))
+
+
+def scaled_side(base: int, scale: float) -> int:
+    # Scale the area of a square grid, not its side.
+    return max(3, round(base * math.sqrt(scale)))
+
+
+def odd(n: int) -> int:
+    return n if n % 2 else n + 1
+
+
+def next_prime(n: int) -> int:
+    def is_prime(v: int):
+        return v >= 2 and all(v % d for d in range(2, math.isqrt(v) + 1))
+
+    while not is_prime(n):
+        n += 1
+    return n
+
+
+def grid_to_text(grid: list[bytearray]) -> str:
+    return '\n'.join(row.decode() for row in grid)
+
+
+def carve_maze(rng: random.Random, n: int, start: tuple[int, int]) -> tuple[list[bytearray], dict]:
+    """
+    Randomised depth-first maze over the odd cells of a `n * n` grid (n is odd).
+    Returns the grid and the parent of every carved cell, so the unique tree path can be recovered.
+    """
+    grid = [bytearray(b'#' * n) for _ in range(n)]
+    sx, sy = start
+    grid[sy][sx] = ord('.')
+    parent = {start: None}
+    stack = [start]
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy, dx, dy) for dx, dy in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                   if 0 < x + dx < n - 1 and 0 < y + dy < n - 1 and (x + dx, y + dy) not in parent]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny, dx, dy = rng.choice(options)
+        grid[y + dy // 2][x + dx // 2] = ord('.')
+        grid[ny][nx] = ord('.')
+        parent[nx, ny] = (x, y)
+        stack.append((nx, ny))
+    return grid, parent
+
+
+@generator(1)
+def gen_day01(rng: random.Random, scale: float) -> Generated:
+    n = scaled(1000, scale)
+    left = [rng.randrange(10000, 100000) for _ in range(n)]
+    right = [rng.choice(left) if rng.random() < 0.2 else rng.randrange(10000, 100000) for _ in range(n)]
+    return '\n'.join(f'{a}   {b}' for a, b in zip(left, right)), []
+
+
+@generator(2)
+def gen_day02(rng: random.Random, scale: float) -> Generated:
+    lines = []
+    for _ in range(scaled(1000, scale)):
+        sign = rng.choice((1, -1))
+        report = [rng.randrange(1, 90)]
+        for _ in range(rng.randrange(4, 8)):
+            report.append(report[-1] + sign * rng.randrange(1, 4))
+        if rng.random() < 0.5:
+            report[rng.randrange(len(report))] += rng.randrange(-5, 6)
+        lines.append(' '.join(map(str, report)))
+    return '\n'.join(lines), []
+
+
+@generator(3)
+def gen_day03(rng: random.Random, scale: float) -> Generated:
+    noise = "mul()don't,[]{}<>!@#$%^&*+-?:; when what who select from 0123456789"
+    chunks = []
+    size = 0
+    target = scaled(18000, scale)
+    while size < target:
+        match rng.randrange(10):
+            case 0:
+                chunk = rng.choice(("do()", "don't()"))
+            case 1 | 2 | 3:
+                chunk = f'mul({rng.randrange(1, 1000)},{rng.randrange(1, 1000)})'
+            case _:
+                chunk = ''.join(rng.choices(noise, k=rng.randrange(1, 12)))
+        chunks.append(chunk)
+        size += len(chunk)
+    text = ''.join(chunks)
+    return '\n'.join(text[i:i + 3000] for i in range(0, len(text), 3000)), []
+
+
+@generator(4)
+def gen_day04(rng: random.Random, scale: float) -> Generated:
+    n = scaled_side(140, scale)
+    return '\n'.join(''.join(rng.choices('XMAS', k=n)) for _ in range(n)), []
+
+
+@generator(5)
+def gen_day05(rng: random.Random, scale: float) -> Generated:
+    pages = rng.sample(range(10, 100), 49)
+    rules = [f'{a}|{b}' for i, a in enumerate(pages) for b in pages[i + 1:]]
+    rng.shuffle(rules)
+
+    updates = []
+    for _ in range(scaled(200, scale)):
+        update = rng.sample(pages, rng.randrange(5, 24, 2))
+        if rng.random() < 0.5:
+            update.sort(key=pages.index)
+        updates.append(','.join(map(str, update)))
+    return '\n'.join(rules) + '\n\n' + '\n'.join(updates), []
+
+
+@generator(6)
+def gen_day06(rng: random.Random, scale: float) -> Generated:
+    n = scaled_side(130, scale)
+    deltas = ((0, -1), (1, 0), (0, 1), (-1, 0))
+    grid = [bytearray(ord('#') if rng.random() < 0.048 else ord('.') for _ in range(n)) for _ in range(n)]
+
+    # The guard must leave the map, or part 1 has no answer. Random boards make short walks, so keep
+    # the start with the longest walk out of a few tries.
+    best, best_start = 0, None
+    for _ in range(64):
+        x, y = start = rng.randrange(n), rng.randrange(n)
+        if grid[y][x] != ord('.'):
+            continue
+        direction, seen = 0, set()
+        while (x, y, direction) not in seen:
+            seen.add((x, y, direction))
+            dx, dy = deltas[direction]
+            if not (0 <= x + dx < n and 0 <= y + dy < n):
+                if len(seen) > best:
+                    best, best_start = len(seen), start
+                break
+            if grid[y + dy][x + dx] == ord('#'):
+                direction = (direction + 1) % 4
+            else:
+                x, y = x + dx, y + dy
+
+    if best_start is None:
+        return gen_day06(rng, scale)
+    grid[best_start[1]][best_start[0]] = ord('^')
+    return grid_to_text(grid), []
+
+
+@generator(7)
+def gen_day07(rng: random.Random, scale: float) -> Generated:
+    lines = []
+    for _ in range(scaled(850, scale)):
+        items = [rng.choice((rng.randrange(1, 10), rng.randrange(1, 100), rng.randrange(1, 1000)))
+                 for _ in range(rng.randrange(3, 13))]
+        result = items[0]
+        for item in items[1:]:
+            match rng.randrange(3):
+                case 0:
+                    result += item
+                case 1:
+                    result *= item
+                case _:
+                    result = int(f'{result}{item}')
+        if rng.random() < 0.4:
+            result += rng.randrange(1, 100)
+        lines.append(f'{result}: {" ".join(map(str, items))}')
+    return '\n'.join(lines), []
+
+
+@generator(8)
+def gen_day08(rng: random.Random, scale: float) -> Generated:
+    n = scaled_side(50, scale)
+    freqs = string.ascii_letters + string.digits
+    grid = [bytearray(b'.' * n) for _ in range(n)]
+    for _ in range(round(0.08 * n * n)):
+        grid[rng.randrange(n)][rng.randrange(n)] = ord(rng.choice(freqs))
+    return grid_to_text(grid), []
+
+
+@generator(9)
+def gen_day09(rng: random.Random, scale: float) -> Generated:
+    n = odd(scaled(19999, scale))
+    return ''.join(str(rng.randrange(1, 10) if i % 2 == 0 else rng.randrange(10)) for i in range(n)), []
+
+
+@generator(10)
+def gen_day10(rng: random.Random, scale: float) -> Generated:
+    n = scaled_side(45, scale)
+    peaks = [(rng.randrange(n), rng.randrange(n)) for _ in range(max(1, n * n // 100))]
+    height = [[9] * n for _ in range(n)]
+    # Multi-source BFS: height drops by one for every step away from the closest peak.
+    dist = [[-1] * n for _ in range(n)]
+    work = []
+    for (x, y) in peaks:
+        dist[y][x] = 0
+        work.append((x, y))
+    for (x, y) in work:
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < n and 0 <= ny < n and dist[ny][nx] < 0:
+                dist[ny][nx] = dist[y][x] + 1
+                work.append((nx, ny))
+    for y in range(n):
+        for x in range(n):
+            height[y][x] = 9 - dist[y][x] % 10
+    return '\n'.join(''.join(map(str, row)) for row in height), []
+
+
+@generator(11)
+def gen_day11(rng: random.Random, scale: float) -> Generated:
+    stones = [rng.randrange(0, 10 ** rng.randrange(1, 8)) for _ in range(scaled(8, scale))]
+    return ' '.join(map(str, stones)), []
+
+
+@generator(12)
+def gen_day12(rng: random.Random, scale: float) -> Generated:
+    n = scaled_side(140, scale)
+    block = 7
+    blocks = [[rng.choice(string.ascii_uppercase) for _ in range(n // block + 2)] for _ in range(n // block + 2)]
+    lines = []
+    for y in range(n):
+        jy = rng.randrange(3)
+        row = []
+        for x in range(n):
+            jx = rng.randrange(3)
+            row.append(blocks[(y + jy) // block][(x + jx) // block])
+        lines.append(''.join(row))
+    return '\n'.join(lines), []
+
+
+@generator(13)
+def gen_day13(rng: random.Random, scale: float) -> Generated:
+    machines = []
+    for _ in range(scaled(320, scale)):
+        while True:
+            ax, ay, bx, by = (rng.randrange(10, 100) for _ in range(4))
+            if ax * by != ay * bx:
+                break
+        if rng.random() < 0.5:
+            a, b = rng.randrange(1, 101), rng.randrange(1, 101)
+            px, py = a * ax + b * bx, a * ay + b * by
+        else:
+            px, py = rng.randrange(1000, 20000), rng.randrange(1000, 20000)
+        machines.append(f'Button A: X+{ax}, Y+{ay}\nButton B: X+{bx}, Y+{by}\nPrize: X={px}, Y={py}')
+    return '\n\n'.join(machines), []
+
+
+@generator(14)
+def gen_day14(rng: random.Random, scale: float) -> Generated:
+    # Keep the robot density, and plant a frame (after the first 100 seconds) where the robots are packed
+    # in a square in the middle, without overlaps: clustered on both axes, like the tree.
+    w = next_prime(scaled_side(101, scale))
+    h = next_prime(w + 1)
+    n = scaled(500, scale)
+    t = rng.randrange(101, w * h)
+    side = math.isqrt(n - 1) + 2
+    x0, y0 = (w - side) // 2, (h - side) // 2
+
+    lines = []
+    for cell in rng.sample(range(side * side), n):
+        x, y = x0 + cell % side, y0 + cell // side
+        vx, vy = rng.randrange(-w + 1, w), rng.randrange(-h + 1, h)
+        lines.append(f'p={(x - vx * t) % w},{(y - vy * t) % h} v={vx},{vy}')
+    return '\n'.join(lines), ['-W', str(w), '-H', str(h)]
+
+
+@generator(15)
+def gen_day15(rng: random.Random, scale: float) -> Generated:
+    n = scaled_side(50, scale)
+    grid = [bytearray(b'#' * n)]
+    for _ in range(n - 2):
+        row = bytearray(b'#')
+        for _ in range(n - 2):
+            r = rng.random()
+            row.append(ord('#') if r < 0.05 else ord('O') if r < 0.3 else ord('.'))
+        row.append(ord('#'))
+        grid.append(row)
+    grid.append(bytearray(b'#' * n))
+    grid[n // 2][n // 2] = ord('@')
+
+    moves = ''.join(rng.choices('<>^v', k=scaled(20000, scale)))
+    moves = '\n'.join(moves[i:i + 1000] for i in range(0, len(moves), 1000))
+    return grid_to_text(grid) + '\n\n' + moves, []
+
+
+@generator(16)
+def gen_day16(rng: random.Random, scale: float) -> Generated:
+    n = odd(scaled_side(141, scale))
+    grid, _ = carve_maze(rng, n, (1, n - 2))
+    # Open a few extra walls so there is more than one best path.
+    for _ in range(n * n // 50):
+        x, y = rng.randrange(1, n - 1), rng.randrange(1, n - 1)
+        if (x + y) % 2 == 1:
+            grid[y][x] = ord('.')
+    grid[n - 2][1] = ord('S')
+    grid[1][n - 2] = ord('E')
+    return grid_to_text(grid), []
+
+
+@generator(17)
+def gen_day17(rng: random.Random, scale: float) -> Generated:
+    # bst A; bxl a; cdv B; bxl b; bxc; out B; adv 3; jnz 0
+    code = [2, 4, 1, rng.randrange(1, 8), 7, 5, 1, rng.randrange(1, 8), 4, rng.randrange(8), 5, 5, 0, 3, 3, 0]
+    reg_a = rng.getrandbits(scaled(48, scale)) | 1
+    program = ','.join(map(str, code))
+    return f'Register A: {reg_a}\nRegister B: 0\nRegister C: 0\n\nProgram: {program}', []
+
+
+@generator(18)
+def gen_day18(rng: random.Random, scale: float) -> Generated:
+    n = scaled_side(71, scale)
+    cells = [(x, y) for y in range(n) for x in range(n) if (x, y) not in ((0, 0), (n - 1, n - 1))]
+    rng.shuffle(cells)
+    walls = cells[:round(0.68 * n * n)]
+    lines = round(0.2 * n * n)
+    return '\n'.join(f'{x},{y}' for x, y in walls), ['-W', str(n), '-H', str(n), '-L', str(lines)]
+
+
+@generator(19)
+def gen_day19(rng: random.Random, scale: float) -> Generated:
+    # No towel starts with "r" or contains "rr", so "rr" can never be matched.
+    towels = {'w', 'u', 'b', 'g'}
+    while len(towels) < 447:
+        towel = rng.choice('wubg') + ''.join(rng.choices('wubrg', k=rng.randrange(0, 8)))
+        if 'rr' not in towel:
+            towels.add(towel)
+    towels = sorted(towels)
+
+    designs = []
+    for _ in range(scaled(400, scale)):
+        design = ''
+        while len(design) < rng.randrange(20, 61):
+            design += rng.choice(towels)
+        if rng.random() < 0.1:
+            # Impossible design, keep the prefix short or the unmemoised part 1 search explodes.
+            cut = rng.randrange(1, 10)
+            design = design[:cut] + 'rr' + design[cut:]
+        designs.append(design)
+    return ', '.join(towels) + '\n\n' + '\n'.join(designs), []
+
+
+@generator(20)
+def gen_day20(rng: random.Random, scale: float) -> Generated:
+    # The racetrack is the unique tree path between two corners of a depth-first maze.
+    n = odd(scaled_side(141, scale))
+    start, end = (1, 1), (n - 2, n - 2)
+    _, parent = carve_maze(rng, n, start)
+    grid = [bytearray(b'#' * n) for _ in range(n)]
+    node = end
+    while node is not None:
+        x, y = node
+        grid[y][x] = ord('.')
+        if (prev := parent[node]) is not None:
+            grid[(y + prev[1]) // 2][(x + prev[0]) // 2] = ord('.')
+        node = prev
+    grid[start[1]][start[0]] = ord('S')
+    grid[end[1]][end[0]] = ord('E')
+    return grid_to_text(grid), ['--threshold', '100']
+
+
+@generator(21)
+def gen_day21(rng: random.Random, scale: float) -> Generated:
+    return '\n'.join(f'{rng.randrange(1000):03d}A' for _ in range(scaled(5, scale))), []
+
+
+@generator(22)
+def gen_day22(rng: random.Random, scale: float) -> Generated:
+    return '\n'.join(str(rng.randrange(1, 1 << 24)) for _ in range(scaled(2000, scale))), []
+
+
+@generator(23)
+def gen_day23(rng: random.Random, scale: float) -> Generated:
+    # Names are two letters, so past 676 computers the network gets denser instead of larger
+    # (capped, the clique search grows exponentially with the degree).
+    names = [a + b for a in string.ascii_lowercase for b in string.ascii_lowercase]
+    rng.shuffle(names)
+    n = min(len(names), scaled(520, scale))
+    degree = min(n // 8, round(13 * scale * 520 / n))
+    names = names[:n]
+
+    edges = set()
+    for _ in range(n * degree // 2):
+        a, b = rng.sample(names, 2)
+        edges.add((min(a, b), max(a, b)))
+
+    # Plant the unique largest network, it must include a "t" computer for the solver to find it.
+    t_names = [name for name in names if name.startswith('t')] or [names[0]]
+    clique = {rng.choice(t_names), *rng.sample(names, 12)}
+    while len(clique) < 13:
+        clique.add(rng.choice(names))
+    for a in clique:
+        for b in clique:
+            if a < b:
+                edges.add((a, b))
+
+    edges = [(a, b) if rng.random() < 0.5 else (b, a) for a, b in edges]
+    rng.shuffle(edges)
+    return '\n'.join(f'{a}-{b}' for a, b in edges), []
+
+
+@generator(24)
+def gen_day24(rng: random.Random, scale: float) -> Generated:
+    # `fix_machine` is written for the 45 bit adder, it can't be scaled.
+    if scale != 1:
+        return None
+
+    bits = 45
+    used = set()
+
+    def new_name():
+        while True:
+            name = ''.join(rng.choices(string.ascii_lowercase[:23], k=3))
+            if name not in used:
+                used.add(name)
+                return name
+
+    gates: dict[str, tuple[str, str, str]] = {}
+    gates['z00'] = ('XOR', 'x00', 'y00')
+    carry = new_name()
+    gates[carry] = ('AND', 'x00', 'y00')
+    parts = {}
+    for i in range(1, bits):
+        x, y, z = f'x{i:02d}', f'y{i:02d}', f'z{i:02d}'
+        t, a, b = new_name(), new_name(), new_name()
+        c = f'z{bits:02d}' if i == bits - 1 else new_name()
+        gates[t] = ('XOR', x, y)
+        gates[z] = ('XOR', t, carry)
+        gates[a] = ('AND', x, y)
+        gates[b] = ('AND', t, carry)
+        gates[c] = ('OR', a, b)
+        parts[i] = (t, a, c)
+        carry = c
+
+    # Two swapped sum outputs, and two swapped half-adder outputs, on distinct bits.
+    for i, kind in zip(rng.sample(range(2, bits - 2), 4), (0, 0, 1, 1)):
+        t, a, c = parts[i]
+        r1, r2 = (f'z{i:02d}', c) if kind == 0 else (t, a)
+        gates[r1], gates[r2] = gates[r2], gates[r1]
+
+    registers = [f'{p}{i:02d}: {rng.randrange(2)}' for p in 'xy' for i in range(bits)]
+    rules = [f'{a} {op} {b} -> {r}' if rng.random() < 0.5 else f'{b} {op} {a} -> {r}'
+             for r, (op, a, b) in gates.items()]
+    rng.shuffle(rules)
+    return '\n'.join(registers) + '\n\n' + '\n'.join(rules), []
+
+
+@generator(25)
+def gen_day25(rng: random.Random, scale: float) -> Generated:
+    schematics = []
+    for _ in range(scaled(500, scale)):
+        heights = [rng.randrange(6) for _ in range(5)]
+        is_lock = rng.random() < 0.5
+        rows = []
+        for level in range(1, 6):
+            if is_lock:
+                rows.append(''.join('#' if level <= h else '.' for h in heights))
+            else:
+                rows.append(''.join('#' if 6 - level <= h else '.' for h in heights))
+        top, bottom = ('#####', '.....') if is_lock else ('.....', '#####')
+        schematics.append('\n'.join([top, *rows, bottom]))
+    return '\n\n'.join(schematics), []
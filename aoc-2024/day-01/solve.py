@@ -21,14 +21,10 @@ def part2(left: List[int], right: List[int]) -> int:
     return similarity_score
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("input", nargs="?", default="sample.txt")
-    args = parser.parse_args()
-
+def solve_parts(input_file: str):
     left = []
     right = []
-    with open(args.input, "r") as file:
+    with open(input_file, "r") as file:
         for line in file:
             m = re.match(r'(\d+)\s+(\d+)', line.strip())
             if m is None:
@@ -36,11 +32,24 @@ def main():
             left.append(int(m.group(1)))
             right.append(int(m.group(2)))
 
-    distance = part1(left, right)
-    print(f'part1: distance = {distance}')
+    yield 1, part1(left, right)
+    yield 2, part2(left, right)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", nargs="?", default="sample.txt")
+    return parser
+
 
-    score = part2(left, right)
-    print(f'part2: score    = {score}')
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input)
+
+
+def main():
+    for (part, result) in parts():
+        print(f'part{part}: {result}')
 
 
 if __name__ == "__main__":
@@ -26,23 +26,28 @@ def get_safe_report_count(reports: List[List[int]], safe_check: Callable[[List[i
     return sum(map(int, map(safe_check, reports)))
 
 
-def solve(input_file: str):
+def solve_parts(input_file: str):
     reports = []
     with open(input_file, "r") as file:
         for line in file:
             reports.append(list(map(int, line.strip().split(' '))))
-    safe_report_count = get_safe_report_count(reports, is_safe_report)
-    print(f"part1: safe = {safe_report_count}")
-    safe_damp_report_count = get_safe_report_count(reports, is_safe_report_damp)
-    print(f"part2: safe = {safe_damp_report_count}")
+    yield 1, get_safe_report_count(reports, is_safe_report)
+    yield 2, get_safe_report_count(reports, is_safe_report_damp)
+
+def get_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", nargs="?", default="sample.txt")
+    return parser
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input)
 
 def main():
     is_safe_report_damp([1, 2, 7, 8, 9])
 
-    parser = argparse.ArgumentParser()
-    parser.add_argument("input", nargs="?", default="sample.txt")
-    args = parser.parse_args()
-    solve(args.input)
+    for (part, safe_report_count) in parts():
+        print(f"part{part}: safe = {safe_report_count}")
 
 if __name__ == "__main__":
     main()
@@ -24,21 +24,28 @@ def part2(input_text: str):
     return result
 
 
-def solve(input_file: str):
+def solve_parts(input_file: str):
     with open(input_file, "r", encoding='utf-8') as file:
         input_text = file.read().strip()
 
-    part1_result = part1(input_text)
-    print(f"part1: {part1_result}")
-    part2_result = part2(input_text)
-    print(f"part2: {part2_result}")
+    yield 1, part1(input_text)
+    yield 2, part2(input_text)
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
-    args = parser.parse_args()
-    solve(args.input)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input)
+
+
+def main():
+    for (part, result) in parts():
+        print(f"part{part}: {result}")
 
 
 if __name__ == "__main__":
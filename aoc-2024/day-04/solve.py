@@ -96,22 +96,29 @@ def part2(input_text: str, verbose: bool):
     return ws.search_x_mas()
 
 
-def solve(input_file: str, verbose: bool):
+def solve_parts(input_file: str, verbose: bool):
     with open(input_file, "r", encoding='utf-8') as file:
         input_text = file.read().strip()
 
-    part1_result = part1(input_text, verbose)
-    print(f"part1: {part1_result}")
-    part2_result = part2(input_text, verbose)
-    print(f"part2: {part2_result}")
+    yield 1, part1(input_text, verbose)
+    yield 2, part2(input_text, verbose)
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("--verbose", action="store_true")
-    args = parser.parse_args()
-    solve(args.input, args.verbose)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.verbose)
+
+
+def main():
+    for (part, result) in parts():
+        print(f"part{part}: {result}")
 
 
 if __name__ == "__main__":
@@ -1,4 +1,6 @@
 import argparse
+from array import array
+from multiprocessing import Pool
 from os import cpu_count
 
 BIT_UP = 1
@@ -35,6 +37,14 @@ dir_delta = {
     BIT_RIGHT: (1, 0)
 }
 
+# Direction index on the flat board, rotating right is `(d + 1) & 3`.
+DIR_INDEX = {
+    BIT_UP: 0,
+    BIT_RIGHT: 1,
+    BIT_DOWN: 2,
+    BIT_LEFT: 3,
+}
+
 
 def rotate_dir(direction: int):
     return DIR_ROTATE[direction]
@@ -46,6 +56,15 @@ class Game:
     size: tuple[int, int]
     pos: tuple[int, int] = (-1, -1)
     direction = DIR_UP
+    jump: dict[int, list[int]] | None = None
+
+    # Flat board, padded with an EXIT border so walking never needs a bound check.
+    flat: bytearray | None = None
+    stride: int = 0
+    steps: tuple[int, int, int, int] = (0, 0, 0, 0)
+    # Visited (cell, direction) states, a state belongs to the current walk when it holds `generation`.
+    visited: array | None = None
+    generation: int = 0
 
     def __init__(self, puzzle: str, verbose: bool = False):
         self.verbose = verbose
@@ -62,10 +81,27 @@ class Game:
                     row.append(c)
             self.board.append(row)
 
-        w = len(self.board[0])
+        w = len(self.board[0]) if self.board else 0
         h = len(self.board)
         self.size = (w, h)
 
+    def to_flat(self):
+        """
+        Flat, row-major copy of the board with everything needed to rebuild the game.
+        Cheap to send to worker processes, unlike the nested lists.
+        """
+        return bytes(c for row in self.board for c in row), self.size, self.pos, self.direction
+
+    @staticmethod
+    def from_flat(board: bytes, size: tuple[int, int], pos: tuple[int, int], direction: int, verbose: bool = False):
+        w, h = size
+        game = Game('', verbose)
+        game.board = [list(board[y * w:(y + 1) * w]) for y in range(h)]
+        game.size = size
+        game.pos = pos
+        game.direction = direction
+        return game
+
     def log(self, message: str):
         if self.verbose:
             print(message)
@@ -77,80 +113,267 @@ class Game:
             return EXIT
         return board[y][x]
 
-    def walk(self, board: list[list[int]], position: tuple[int, int], direction: int):
-        if direction not in dir_delta:
-            raise ValueError(f"Invalid direction: {direction}")
-
+    def build_flat(self):
         w, h = self.size
-        x, y = position
-        dx, dy = dir_delta[direction]
-        x += dx
-        y += dy
+        stride = w + 2
+        flat = bytearray(stride * (h + 2))
+        for (y, row) in enumerate(self.board):
+            start = (y + 1) * stride + 1
+            flat[start:start + w] = bytes(row)
+
+        self.flat = flat
+        self.stride = stride
+        self.steps = (-stride, 1, stride, -1)
+        self.visited = array('I', [0]) * (len(flat) * 4)
+        self.generation = 0
+
+    def flat_index(self, pos: tuple[int, int]):
+        x, y = pos
+        return (y + 1) * self.stride + x + 1
+
+    def next_generation(self):
+        if self.flat is None:
+            self.build_flat()
+
+        self.generation += 1
+        if self.generation > 0xFFFFFFFF:
+            self.visited = array('I', [0]) * len(self.visited)
+            self.generation = 1
+        return self.generation
+
+    def walk_flat(self):
+        """
+        Walk the guard on the flat board, returns True if it leaves the board.
+        Every state walked is marked in `visited` with the current generation.
+        """
+        gen = self.next_generation()
+        flat = self.flat
+        visited = self.visited
+        steps = self.steps
+
+        pos = self.flat_index(self.pos)
+        d = DIR_INDEX[self.direction]
+        step = steps[d]
+        while True:
+            state = (pos << 2) | d
+            if visited[state] == gen:
+                return False
+            visited[state] = gen
 
-        if x < 0 or y < 0 or x >= w or y >= h:
-            return (x, y), EXIT
-        return (x, y), board[y][x]
+            block = flat[pos + step]
+            if block == WALL:
+                d = (d + 1) & 3
+                step = steps[d]
+            elif block == EXIT:
+                return True
+            else:
+                pos += step
+
+    def get_walked_cells(self):
+        # Flat index of the cells walked in the current generation, besides the start.
+        gen = self.generation
+        start = self.flat_index(self.pos)
+        visited = self.visited
+        return [i for i in range(len(self.flat)) if i != start and gen in visited[i << 2:(i + 1) << 2]]
 
     def solve(self):
-        exit_path = self.get_exit_path(self.board)
-        if exit_path is None:
+        # Yields part 1, then part 2.
+        if not self.walk_flat():
             raise ValueError("Game does not exit")
 
-        x, y = self.pos
-        exit_path[y][x] = 0
-
-        p1 = 1  # include initial player position
+        cells = self.get_walked_cells()
+        yield len(cells) + 1  # include initial player position
         p2 = 0
-        for (y, row) in enumerate(exit_path):
-            for (x, visit) in enumerate(row):
-                if visit == 0:
-                    continue
-                p1 += 1
-
-                board_copy = [row.copy() for row in self.board]
-                board_copy[y][x] = WALL
-                if self.get_exit_path(board_copy) is None:
-                    p2 += 1
-
-        return p1, p2
-
-    def get_exit_path(self, board: list[list[int]]):
+        for cell in cells:
+            self.flat[cell] = WALL
+            if not self.walk_flat():
+                p2 += 1
+            self.flat[cell] = EMPTY
+
+        yield p2
+
+    def build_jump_table(self):
+        """
+        For every cell and direction, the coordinate (along the walking axis) where the guard stops
+        before the next wall. Leaving the board is a stop just outside of it (-1, w or h).
+        """
+        w, h = self.size
+        jump = {d: [0] * (w * h) for d in (BIT_UP, BIT_RIGHT, BIT_DOWN, BIT_LEFT)}
+
+        for y, row in enumerate(self.board):
+            stop = -1
+            for x in range(w):
+                if row[x] == WALL:
+                    stop = x + 1
+                jump[BIT_LEFT][y * w + x] = stop
+            stop = w
+            for x in range(w - 1, -1, -1):
+                if row[x] == WALL:
+                    stop = x - 1
+                jump[BIT_RIGHT][y * w + x] = stop
+
+        for x in range(w):
+            stop = -1
+            for y in range(h):
+                if self.board[y][x] == WALL:
+                    stop = y + 1
+                jump[BIT_UP][y * w + x] = stop
+            stop = h
+            for y in range(h - 1, -1, -1):
+                if self.board[y][x] == WALL:
+                    stop = y - 1
+                jump[BIT_DOWN][y * w + x] = stop
+
+        return jump
+
+    def get_obstruction_starts(self):
+        """
+        Walk the original path once, and for every cell on it remember the state right before the
+        guard first steps onto it. An obstruction there can't change anything before that state.
+        """
         w, h = self.size
-        pos = self.pos
+        x, y = self.pos
         direction = self.direction
-        visited = [[0] * w for _ in board]
+        starts: dict[tuple[int, int], tuple[int, int, int]] = {}
+        seen = set()
         while True:
-            (x, y), block = self.walk(board, pos, direction)
-
-            if block == WALL:
+            if (x, y, direction) in seen:
+                raise ValueError("Game does not exit")
+            seen.add((x, y, direction))
+
+            dx, dy = dir_delta[direction]
+            nx, ny = x + dx, y + dy
+            if nx < 0 or ny < 0 or nx >= w or ny >= h:
+                return starts
+            if self.board[ny][nx] == WALL:
                 direction = rotate_dir(direction)
-                x, y = pos  # reset position
-            elif block == EXIT:
-                return visited
+                continue
+            if (nx, ny) != self.pos and (nx, ny) not in starts:
+                starts[nx, ny] = (x, y, direction)
+            x, y = nx, ny
+
+    def is_loop_with_obstruction(self, jump: dict[int, list[int]], obstruction: tuple[int, int],
+                                 start: tuple[int, int, int]):
+        w, h = self.size
+        ox, oy = obstruction
+        x, y, direction = start
+        seen = set()
+        while True:
+            state = ((y * w + x) << 4) | direction
+            if state in seen:
+                return True
+            seen.add(state)
+
+            stop = jump[direction][y * w + x]
+            # The table does not know about the new obstruction, stop in front of it when it is on the way.
+            if direction == BIT_UP:
+                if ox == x and stop <= oy < y:
+                    stop = oy + 1
+                elif stop < 0:
+                    return False
+                y = stop
+            elif direction == BIT_DOWN:
+                if ox == x and y < oy <= stop:
+                    stop = oy - 1
+                elif stop >= h:
+                    return False
+                y = stop
+            elif direction == BIT_LEFT:
+                if oy == y and stop <= ox < x:
+                    stop = ox + 1
+                elif stop < 0:
+                    return False
+                x = stop
+            else:
+                if oy == y and x < ox <= stop:
+                    stop = ox - 1
+                elif stop >= w:
+                    return False
+                x = stop
+            direction = rotate_dir(direction)
+
+    def get_jump_table(self):
+        if self.jump is None:
+            self.jump = self.build_jump_table()
+        return self.jump
+
+    def count_loops(self, candidates: list[tuple[tuple[int, int], tuple[int, int, int]]], engine: str):
+        result = 0
+        for (obstruction, start) in candidates:
+            if engine == 'jump':
+                is_loop = self.is_loop_with_obstruction(self.get_jump_table(), obstruction, start)
             else:
-                pos = (x, y)
+                if self.flat is None:
+                    self.build_flat()
+                cell = self.flat_index(obstruction)
+                self.flat[cell] = WALL
+                is_loop = not self.walk_flat()
+                self.flat[cell] = EMPTY
+
+            if is_loop:
+                self.log(f'loop with obstruction at {obstruction}')
+                result += 1
+        return result
+
+    def solve_jump(self):
+        starts = self.get_obstruction_starts()
+        yield len(starts) + 1  # include initial player position
+        yield self.count_loops(list(starts.items()), 'jump')
+
+    def solve_parallel(self, engine: str, threads: int):
+        starts = self.get_obstruction_starts()
+        candidates = list(starts.items())
+        yield len(starts) + 1  # include initial player position
+
+        # A few chunks per worker: one message per candidate costs more than the jump walk itself.
+        chunk_size = max(1, len(candidates) // (threads * 4))
+        chunks = [(engine, candidates[i:i + chunk_size]) for i in range(0, len(candidates), chunk_size)]
+        with Pool(threads, initializer=init_worker, initargs=self.to_flat()) as pool:
+            yield sum(pool.imap_unordered(count_loops_worker, chunks))
+
 
-            if visited[y][x] & direction != 0:
-                return None
-            visited[y][x] |= direction
+g_worker: Game | None = None
 
 
-def solve(input_file: str, verbose: bool):
+def init_worker(board: bytes, size: tuple[int, int], pos: tuple[int, int], direction: int):
+    global g_worker
+    g_worker = Game.from_flat(board, size, pos, direction)
+
+
+def count_loops_worker(args: tuple[str, list[tuple[tuple[int, int], tuple[int, int, int]]]]):
+    engine, candidates = args
+    return g_worker.count_loops(candidates, engine)
+
+
+def solve_parts(input_file: str, verbose: bool, engine: str, threads: int):
     with open(input_file, "r", encoding='utf-8') as file:
         input_text = file.read().strip()
 
     game = Game(input_text, verbose)
-    p1, p2 = game.solve()
-    print(f"part1: {p1}")
-    print(f"part2: {p2}")
+    if threads > 1:
+        answers = game.solve_parallel(engine, threads)
+    else:
+        answers = game.solve_jump() if engine == 'jump' else game.solve()
+    yield from enumerate(answers, 1)
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("--verbose", action="store_true")
-    args = parser.parse_args()
-    solve(args.input, args.verbose)
+    parser.add_argument("-e", "--engine", choices=("jump", "brute"), default="jump")
+    parser.add_argument("-t", "--threads", type=int, default=max(cpu_count() - 1, 1))
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.verbose, args.engine, args.threads)
+
+
+def main():
+    for (part, result) in parts():
+        print(f"part{part}: {result}")
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 import argparse
 import itertools
+from functools import partial
 from multiprocessing import Pool
 from os import cpu_count
 from operator import add, mul
@@ -12,6 +13,11 @@ ops_def = {
     '||': lambda x, y: int(f'{x}{y}'),
 }
 
+# Line classification, from a single walk over the operator tree.
+UNSOLVABLE = 0
+SOLVABLE_WITH_CONCAT = 1  # only solvable with `||`, counts for part 2
+SOLVABLE = 2  # solvable with `+` and `*`, counts for both parts
+
 
 class Game:
     result: int # expected result
@@ -23,51 +29,131 @@ class Game:
         self.result = int(result)
         self.first, *self.items = [int(x) for x in items.split(' ')]
 
-    def solve(self, allowed_ops: tuple[str, ...]):
-        for ops in itertools.product(allowed_ops, repeat=len(self.items)):
-            if self.calc(ops) == self.result:
-                return self.result
-
-        return 0
-
     def calc(self, ops: tuple[str, ...]):
         result = self.first
         for (op, item) in zip(ops, self.items):
             result = ops_def[op](result, item)
         return result
 
+    def classify(self) -> tuple[int, tuple[str, ...] | None]:
+        """
+        Explore the operator tree once (backwards from the result), for both parts.
+        `+`/`*` branches go first; below a `||` the first solution is enough, it can't count for part 1.
+        """
+        return self.classify_undo(self.result, len(self.items), False)
+
+    def classify_undo(self, target: int, n: int, concat: bool) -> tuple[int, tuple[str, ...] | None]:
+        if n == 0:
+            if target != self.first:
+                return UNSOLVABLE, None
+            return (SOLVABLE_WITH_CONCAT if concat else SOLVABLE), ()
+
+        item = self.items[n - 1]
+        best, best_ops = UNSOLVABLE, None
+
+        if item == 0:
+            if target == 0:
+                return (SOLVABLE_WITH_CONCAT if concat else SOLVABLE), ('+',) * (n - 1) + ('*',)
+        elif target % item == 0:
+            best, best_ops = self.classify_undo(target // item, n - 1, concat)
+            if best_ops is not None:
+                best_ops += ('*',)
+                if best == SOLVABLE or concat:
+                    return best, best_ops
+
+        if target >= item:
+            found, ops = self.classify_undo(target - item, n - 1, concat)
+            if found > best:
+                best, best_ops = found, ops + ('+',)
+                if best == SOLVABLE or concat:
+                    return best, best_ops
+
+        if best == UNSOLVABLE:
+            base = 10
+            while base <= item:
+                base *= 10
+            if target % base == item:
+                found, ops = self.classify_undo(target // base, n - 1, True)
+                if found:
+                    return found, ops + ('||',)
+
+        return best, best_ops
+
+    def classify_brute(self) -> tuple[int, tuple[str, ...] | None]:
+        found = UNSOLVABLE, None
+        for ops in itertools.product(('+', '*', '||'), repeat=len(self.items)):
+            if self.calc(ops) == self.result:
+                if '||' not in ops:
+                    return SOLVABLE, ops
+                if not found[0]:
+                    found = SOLVABLE_WITH_CONCAT, ops
+        return found
 
-def solve_line(line: str):
+    def format(self, ops: tuple[str, ...]):
+        return f'{self.result} = {self.first} ' + ' '.join(f'{op} {item}' for (op, item) in zip(ops, self.items))
+
+
+def solve_line(line: str, mode: str = 'reverse', verbose: bool = False):
     game = Game(line)
-    r1 = game.solve(('+', '*'))
-    # skip check if r1 already found an answer
-    r2 = r1 or game.solve(('+', '*', '||'))
-    return r1, r2
+    found, ops = game.classify_brute() if mode == 'brute' else game.classify()
+    r1 = game.result if found == SOLVABLE else 0
+    r2 = game.result if found != UNSOLVABLE else 0
+    return r1, r2, verbose and ops and game.format(ops)
+
+
+def solve_batch(lines: list[str], mode: str = 'reverse', verbose: bool = False):
+    # One message per batch instead of one per line, equations are only sent back for --verbose.
+    p1 = 0
+    p2 = 0
+    equations = []
+    for line in lines:
+        r1, r2, equation = solve_line(line, mode, verbose)
+        p1 += r1
+        p2 += r2
+        equation and equations.append(equation)
+    return len(lines), p1, p2, equations
 
 
-def solve(input_file: str, threads: int):
+def solve_parts(input_file: str, threads: int, mode: str, verbose: bool):
     with open(input_file, "r", encoding='utf-8') as file:
         input_text = file.read().strip()
 
     lines = input_text.splitlines()
 
+    batch_size = max(1, min(1024, len(lines) // (threads * 8)))
+    batches = [lines[i:i + batch_size] for i in range(0, len(lines), batch_size)]
+
     p2 = 0
     p1 = 0
-    with Pool(threads) as pool:
-        for (r1, r2) in tqdm(pool.imap_unordered(solve_line, lines), total=len(lines)):
+    with Pool(threads) as pool, tqdm(total=len(lines)) as progress:
+        for (count, r1, r2, equations) in pool.imap_unordered(partial(solve_batch, mode=mode, verbose=verbose), batches):
+            equations and tqdm.write('\n'.join(equations))
+            progress.update(count)
             p1 += r1
             p2 += r2
 
-    print(f'Part 1: {p1}')
-    print(f'Part 2: {p2}')
+    # Both totals come from the same pass over the lines.
+    yield 1, p1
+    yield 2, p2
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-t", "--threads", type=int, default=max(cpu_count() - 1, 1))
-    args = parser.parse_args()
-    solve(args.input, args.threads)
+    parser.add_argument("-m", "--mode", choices=("reverse", "brute"), default="reverse")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.threads, args.mode, args.verbose)
+
+
+def main():
+    for (part, total) in parts():
+        print(f'Part {part}: {total}')
 
 
 if __name__ == "__main__":
@@ -80,7 +80,7 @@ class Game:
         return '\n'.join(map(''.join, board))
 
 
-def solve(input_path, verbose):
+def solve_parts(input_path, verbose):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip()
     game = Game(input_text)
@@ -89,23 +89,32 @@ def solve(input_path, verbose):
     if verbose:
         print(game.merge_to_str(p1))
         print('-' * 80)
-    print(f'part 1: {len(p1)}')
+    yield 1, len(p1)
 
     p2 = game.find_antinodes(True)
     if verbose:
         print("")
         print(game.merge_to_str(p2))
         print('-' * 80)
-    print(f'part 2: {len(p2)}')
+    yield 2, len(p2)
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
     # parser.add_argument("-t", "--threads", type=int, default=max(cpu_count() - 1, 1))
-    args = parser.parse_args()
-    solve(args.input, args.verbose)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.verbose)
+
+
+def main():
+    for (part, count) in parts():
+        print(f'part {part}: {count}')
 
 
 if __name__ == "__main__":
@@ -1,92 +1,157 @@
 import argparse
+import heapq
+from array import array
 
 EMPTY = -1
+MAX_SIZE = 9
 
 
 class Disk:
-    data: list[int] = []
-    pos_data: list[tuple[int, int]] = []
-    free_data: list[tuple[int, int]] = []
+    pos_data: list[tuple[int, int]]  # (position, size) of each file, by id
+    free_data: list[tuple[int, int]]  # (position, size) of each gap, gap i follows file i
+    top_block_id: int
+    size: int
 
     def __init__(self, disk_map: str):
-        self.data = []
         self.pos_data = []
+        self.free_data = []
 
-        block_id = 0
+        offset = 0
         for (i, size) in enumerate(map(int, disk_map)):
             if i % 2 == 0:
-                self.pos_data.append((len(self.data), size))
-                self.data += [block_id] * size
-                block_id += 1
+                self.pos_data.append((offset, size))
             else:
-                self.free_data.append((len(self.data), size))
-                self.data += [EMPTY] * size
-        self.top_block_id = block_id
+                self.free_data.append((offset, size))
+            offset += size
+        self.top_block_id = len(self.pos_data)
+        self.size = offset
+
+    def expand(self, spans: list[tuple[int, int, int]] | None = None):
+        """
+        Expanded view of the disk, one item per block. Only meant for printing.
+        """
+        if spans is None:
+            spans = [(blk_id, blk_idx, blk_size) for (blk_id, (blk_idx, blk_size)) in enumerate(self.pos_data)]
+
+        data = array('i', [EMPTY]) * self.size
+        for (blk_id, blk_idx, blk_size) in spans:
+            data[blk_idx:blk_idx + blk_size] = array('i', [blk_id]) * blk_size
+        return data
+
+    def iter_compacted_p1(self):
+        """
+        Two pointers over the runs: fill the gap after file `i` with the last blocks of file `j`.
+        Yields (id, position, size) of each run of the compacted disk, never expanding it.
+        """
+        pos_data = self.pos_data
+        free_data = self.free_data
+        if not pos_data:
+            return
+
+        j = len(pos_data) - 1
+        remaining = pos_data[j][1]  # blocks of file j not moved yet
+        pos = 0
+        for i in range(len(pos_data)):
+            if i > j:
+                break
+            size = remaining if i == j else pos_data[i][1]
+            yield i, pos, size
+            pos += size
+            if i == j:
+                break
+
+            gap = free_data[i][1] if i < len(free_data) else 0
+            while gap > 0 and j > i:
+                take = min(gap, remaining)
+                if take:
+                    yield j, pos, take
+                pos += take
+                gap -= take
+                remaining -= take
+                if remaining == 0:
+                    j -= 1
+                    remaining = pos_data[j][1]
+
+    def compact_and_checksum_p1(self):
+        return sum(self.block_checksum(*span) for span in self.iter_compacted_p1())
 
     def compact_disk_p1(self):
-        result = self.data.copy()
-
-        i = 0
-        j = len(result) - 1
-        while i < j:
-            if result[i] != EMPTY:
-                i += 1
-                continue
-            if result[j] == EMPTY:
-                j -= 1
-                continue
-            result[i] = result[j]
-            result[j] = EMPTY
-        return result
+        return self.expand(list(self.iter_compacted_p1()))
 
     def compact_and_checksum(self):
-        pos_data = self.pos_data.copy()
-        free_data = self.free_data.copy()
+        # Index the free space by size: `free_heaps[size]` is a min-heap of the positions of gaps of that size.
+        # The leftmost gap that fits is the smallest top of `free_heaps[blk_size:]`.
+        free_heaps: list[list[int]] = [[] for _ in range(MAX_SIZE + 1)]
+        for (free_idx, free_size) in self.free_data:
+            if free_size > 0:
+                free_heaps[free_size].append(free_idx)  # already sorted, so already a heap
 
         # The free space does not merge automatically, and we don't bother with the free space
         #   after current position, so we don't need to worry about merging empty spaces.
-        for (blk_id, (blk_idx, blk_size)) in reversed(list(enumerate(pos_data))):
-            for (j, (free_idx, free_size)) in enumerate(free_data):
-                if free_idx >= blk_idx: break
-
-                if free_size >= blk_size:
-                    pos_data[blk_id] = (free_idx, blk_size)
-                    free_data[j] = (free_idx + blk_size, free_size - blk_size)
-                    break
-
-        # Implement the checksum over the compacted disk
         checksum = 0
-        for (blk_id, (blk_idx, blk_size)) in enumerate(pos_data):
-            for i in range(blk_size):
-                checksum += blk_id * blk_idx
-                blk_idx += 1
+        for blk_id in range(len(self.pos_data) - 1, -1, -1):
+            blk_idx, blk_size = self.pos_data[blk_id]
+
+            best_size = 0
+            best_idx = blk_idx
+            for size in range(blk_size, MAX_SIZE + 1):
+                heap = free_heaps[size]
+                if heap and heap[0] < best_idx:
+                    best_idx = heap[0]
+                    best_size = size
+
+            if best_size:
+                heapq.heappop(free_heaps[best_size])
+                if best_size > blk_size:
+                    heapq.heappush(free_heaps[best_size - blk_size], best_idx + blk_size)
+                blk_idx = best_idx
+
+            checksum += self.block_checksum(blk_id, blk_idx, blk_size)
         return checksum
 
     @staticmethod
-    def checksum(data: list[int]):
+    def block_checksum(blk_id: int, blk_idx: int, blk_size: int):
+        # blk_id * (blk_idx + (blk_idx + 1) + ... + (blk_idx + blk_size - 1))
+        return blk_id * (blk_idx * blk_size + blk_size * (blk_size - 1) // 2)
+
+    @staticmethod
+    def checksum(data: list[int] | array):
         return sum([i * disk_id for (i, disk_id) in enumerate(data) if disk_id != EMPTY])
 
+    @staticmethod
+    def to_str(data: list[int] | array):
+        return ''.join('.' if disk_id == EMPTY else str(disk_id) for disk_id in data)
+
 
-def solve(input_path, verbose):
+def solve_parts(input_path, verbose):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip()
 
     disk = Disk(input_text)
+    if verbose:
+        print(disk.to_str(disk.expand()))
+        print(disk.to_str(disk.compact_disk_p1()))
 
-    p1 = disk.checksum(disk.compact_disk_p1())
-    print(f'p1 = {p1}')
-
-    p2 = disk.compact_and_checksum()
-    print(f'p2 = {p2}')
+    yield 1, disk.compact_and_checksum_p1()
+    yield 2, disk.compact_and_checksum()
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
     # parser.add_argument("-t", "--threads", type=int, default=max(cpu_count() - 1, 1))
-    args = parser.parse_args()
-    solve(args.input, args.verbose)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.verbose)
+
+
+def main():
+    for (part, checksum) in parts():
+        print(f'p{part} = {checksum}')
 
 
 if __name__ == "__main__":
@@ -59,27 +59,33 @@ class Board:
         return total_trails
 
 
-def solve(input_path, verbose):
+def solve_parts(input_path, verbose):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip()
 
     board = Board(input_text, verbose)
 
-    p1 = board.solve(dedup=True)
+    yield 1, board.solve(dedup=True)
     verbose and print('-*' * 20 + '-')
-    p2 = board.solve(dedup=False)
+    yield 2, board.solve(dedup=False)
 
-    print(f'p1 = {p1}')
-    print(f'p2 = {p2}')
 
-
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
     # parser.add_argument("-t", "--threads", type=int, default=max(cpu_count() - 1, 1))
-    args = parser.parse_args()
-    solve(args.input, args.verbose)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.verbose)
+
+
+def main():
+    for (part, trails) in parts():
+        print(f'p{part} = {trails}')
 
 
 if __name__ == "__main__":
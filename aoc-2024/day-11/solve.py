@@ -1,17 +1,27 @@
 import argparse
-import math
+import os
+import pickle
 from collections import Counter
 
+import numpy as np
+
+
+def count_digits(stone: int):
+    digits = 1
+    bound = 10
+    while stone >= bound:
+        bound *= 10
+        digits += 1
+    return digits
+
 
 def blink_once(stone: int):
     if stone == 0:
         return (1,)
 
-    digits = math.floor(math.log10(stone)) + 1
+    digits = count_digits(stone)
     if digits % 2 == 0:
-        mod = math.pow(10, digits / 2)
-        l = int(stone // mod)
-        r = int(stone % mod)
+        l, r = divmod(stone, 10 ** (digits // 2))
         return l, r
 
     return (stone * 2024,)
@@ -28,27 +38,267 @@ def blink(input_stones: list[int]):
         yield lambda: sum(stones.values())
 
 
-def solve(input_path, verbose):
+class BlinkCache:
+    """
+    Memo of `(stone, blinks) -> number of stones`, shared by every blink depth,
+    and optionally kept on disk between runs.
+    """
+    memo: dict[tuple[int, int], int]
+    path: str | None
+
+    def __init__(self, path: str | None = None):
+        self.memo = {}
+        self.path = path
+        if path and os.path.exists(path):
+            with open(path, 'rb') as file:
+                self.memo = pickle.load(file)
+
+    def save(self):
+        if self.path:
+            with open(self.path, 'wb') as file:
+                pickle.dump(self.memo, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def count(self, stone: int, blinks: int) -> int:
+        memo = self.memo
+        if (stone, blinks) in memo:
+            return memo[stone, blinks]
+
+        # Depth first with an explicit stack, 500 blinks would overflow the recursion limit.
+        stack = [(stone, blinks)]
+        while stack:
+            key = stack[-1]
+            if key in memo:
+                stack.pop()
+                continue
+
+            s, n = key
+            if n == 0:
+                memo[key] = 1
+                stack.pop()
+                continue
+
+            children = [(child, n - 1) for child in blink_once(s)]
+            missing = [child for child in children if child not in memo]
+            if missing:
+                stack.extend(missing)
+                continue
+            memo[key] = sum(memo[child] for child in children)
+            stack.pop()
+        return memo[stone, blinks]
+
+    def count_all(self, stones: list[int], blinks: int) -> int:
+        return sum(self.count(stone, blinks) * count for (stone, count) in Counter(stones).items())
+
+
+# Exact counts take one big-int sparse step per blink, and grow by a digit every few blinks.
+MAX_EXACT_BLINKS = 10_000
+
+
+def is_prime(n: int):
+    return n >= 2 and all(n % d for d in range(2, int(n ** 0.5) + 1))
+
+
+def poly_mul_mod(a: np.ndarray, b: np.ndarray, modulus: int):
+    # int64 convolution overflows with 31-bit coefficients, split them in 16-bit halves.
+    a0, a1 = a & 0xFFFF, a >> 16
+    b0, b1 = b & 0xFFFF, b >> 16
+    lo = np.convolve(a0, b0) % modulus
+    mid = (np.convolve(a0, b1) + np.convolve(a1, b0)) % modulus
+    hi = np.convolve(a1, b1) % modulus
+    return (hi * ((1 << 32) % modulus) % modulus + (mid << 16) % modulus + lo) % modulus
+
+
+class TransitionTable:
+    """
+    Blinking only ever produces stones from a finite set, so it is a linear map over their counts.
+    `src -> dst` are the (sparse) edges of that map, over the indexes of `stones`.
+    """
+    stones: list[int]
+    index: dict[int, int]
+    src: np.ndarray
+    dst: np.ndarray
+    recurrences: dict[int, tuple[np.ndarray, np.ndarray]]
+
+    def __init__(self, input_stones: list[int]):
+        self.stones = []
+        self.index = {}
+        self.recurrences = {}
+        for stone in input_stones:
+            self.add(stone)
+
+        src = []
+        dst = []
+        for (i, stone) in enumerate(self.stones):  # grows while we iterate, until closed
+            for next_stone in blink_once(stone):
+                src.append(i)
+                dst.append(self.add(next_stone))
+        self.src = np.array(src, dtype=np.int64)
+        self.dst = np.array(dst, dtype=np.int64)
+
+    def add(self, stone: int):
+        if stone not in self.index:
+            self.index[stone] = len(self.stones)
+            self.stones.append(stone)
+        return self.index[stone]
+
+    def vector(self, input_stones: list[int], dtype=np.int64):
+        v = np.zeros(len(self.stones), dtype=dtype)
+        for stone in input_stones:
+            v[self.index[stone]] += 1
+        return v
+
+    def step(self, v: np.ndarray, modulus: int | None):
+        if modulus is None:
+            result = np.zeros(len(v), dtype=object)
+            np.add.at(result, self.dst, v[self.src])
+            return result
+        # Values < 2^31, summed over a handful of parents: exact in float64.
+        return np.bincount(self.dst, weights=v[self.src], minlength=len(v)).astype(np.int64) % modulus
+
+    def sequence(self, input_stones: list[int], n: int, modulus: int | None):
+        v = self.vector(input_stones, dtype=np.int64 if modulus else object)
+        result = []
+        for _ in range(n):
+            result.append(int(v.sum()) % modulus if modulus else int(v.sum()))
+            v = self.step(v, modulus)
+        return result
+
+    def count(self, input_stones: list[int], blinks: int, modulus: int | None = None):
+        """
+        Number of stones after `blinks`, modulo `modulus` (a prime below 2^31) when given.
+        Without a modulus, the exact count is computed one sparse step at a time, up to `MAX_EXACT_BLINKS`.
+        """
+        if modulus is None and blinks > MAX_EXACT_BLINKS:
+            raise ValueError(f"exact counts are limited to {MAX_EXACT_BLINKS} blinks, use a modulus for {blinks}")
+
+        dim = len(self.stones)
+        if modulus is None or blinks < 2 * dim:
+            return self.sequence(input_stones, blinks + 1, modulus)[blinks]
+
+        if not is_prime(modulus) or modulus >= 1 << 31:
+            raise ValueError(f"modulus must be a prime below 2^31: {modulus}")
+
+        # The totals follow a linear recurrence of order <= dim (Cayley-Hamilton), 2 * dim terms pin it down.
+        if modulus not in self.recurrences:
+            seq = np.array(self.sequence(input_stones, 2 * dim, modulus), dtype=np.int64)
+            self.recurrences[modulus] = seq, berlekamp_massey(seq, modulus)
+        seq, coefficients = self.recurrences[modulus]
+        return kitamasa(seq, coefficients, blinks, modulus)
+
+
+def berlekamp_massey(seq: np.ndarray, modulus: int):
+    """
+    Shortest recurrence `s[n] = c[0] * s[n - 1] + ... + c[L - 1] * s[n - L]` (mod a prime).
+    """
+    n = len(seq)
+    c = np.zeros(n + 1, dtype=np.int64)
+    b = np.zeros(n + 1, dtype=np.int64)
+    c[0] = b[0] = 1
+    length, shift, last_d = 0, 1, 1
+    for i in range(n):
+        d = int(seq[i])
+        if length:
+            d = (d + int((c[1:length + 1] * seq[i - 1::-1][:length] % modulus).sum())) % modulus
+        if d == 0:
+            shift += 1
+            continue
+
+        coefficient = d * pow(last_d, modulus - 2, modulus) % modulus
+        prev = c.copy()
+        c[shift:] = (c[shift:] - coefficient * b[:n + 1 - shift]) % modulus
+        if 2 * length <= i:
+            length, b, last_d, shift = i + 1 - length, prev, d, 1
+        else:
+            shift += 1
+    return (-c[1:length + 1]) % modulus
+
+
+def kitamasa(seq: np.ndarray, coefficients: np.ndarray, n: int, modulus: int):
+    """
+    `s[n]` of a linear recurrence: repeated squaring of `x` modulo its characteristic polynomial,
+    the same as raising the transition matrix to the power of `n`, but over `L` coefficients.
+    """
+    order = len(coefficients)
+    if order == 0:
+        return 0
+    # x^L = c[0] * x^(L-1) + ... + c[L-1], lowest power first
+    tail = coefficients[::-1].copy()
+
+    def reduce(poly: np.ndarray):
+        poly = poly.copy()
+        for k in range(len(poly) - 1, order - 1, -1):
+            if t := int(poly[k]):
+                poly[k - order:k] = (poly[k - order:k] + t * tail) % modulus
+        return poly[:order]
+
+    result = np.zeros(order, dtype=np.int64)
+    result[0] = 1
+    for bit in bin(n)[2:]:
+        result = reduce(poly_mul_mod(result, result, modulus))
+        if bit == '1':
+            result = reduce(np.concatenate(([0], result)))
+    return int((result * seq[:order] % modulus).sum() % modulus)
+
+
+def solve_blinks(input_path, verbose, blinks: list[int], mode: str, cache_path: str | None, modulus: int | None):
+    """
+    `(blinks, stones)` for each blink count, smallest first, each one as soon as it is known.
+    """
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip()
 
     puzzle = list(map(int, input_text.split(' ')))
+    blinks = sorted(set(blinks))
 
-    for (i, fetch_result) in zip(range(1, 75 + 1), blink(puzzle)):
-        match i:
-            case 25:
-                print(f'p1: {fetch_result()}')
-            case 75:
-                print(f'p2: {fetch_result()}')
+    if mode == 'matrix':
+        table = TransitionTable(puzzle)
+        verbose and print(f'closed set: {len(table.stones)} stones, {len(table.src)} transitions')
+        for n in blinks:
+            yield n, table.count(puzzle, n, modulus)
+    elif mode == 'counter':
+        for (i, fetch_result) in zip(range(1, max(blinks) + 1), blink(puzzle)):
+            if i in blinks:
+                yield i, fetch_result()
+    else:
+        cache = BlinkCache(cache_path)
+        verbose and print(f'cache: {len(cache.memo)} entries loaded')
+        for n in blinks:
+            yield n, cache.count_all(puzzle, n)
+        verbose and print(f'cache: {len(cache.memo)} entries')
+        cache.save()
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("-b", "--blinks", type=int, nargs="+", default=[25, 75])
+    parser.add_argument("-m", "--mode", choices=("memo", "counter", "matrix"), default="memo")
+    parser.add_argument("-M", "--modulus", type=int, help="Count modulo this prime (< 2^31), for huge blink counts")
+    parser.add_argument("-c", "--cache", help="Load and save the (stone, blinks) memo (pickle, trusted file only)")
     # parser.add_argument("-t", "--threads", type=int, default=max(cpu_count() - 1, 1))
-    args = parser.parse_args()
-    solve(args.input, args.verbose)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.mode == 'matrix' and args.modulus is None and max(args.blinks) > MAX_EXACT_BLINKS:
+        parser.error(f"--mode matrix needs --modulus past {MAX_EXACT_BLINKS} blinks")
+
+    for (n, stones) in solve_blinks(args.input, args.verbose, args.blinks, args.mode, args.cache, args.modulus):
+        match n:
+            case 25:
+                yield 1, stones
+            case 75:
+                yield 2, stones
+            case _:
+                print(f'blink {n}: {stones}')
+
+
+def main():
+    for (part, stones) in parts():
+        print(f'p{part}: {stones}')
 
 
 if __name__ == "__main__":
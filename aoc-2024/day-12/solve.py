@@ -1,154 +1,116 @@
 import argparse
-from itertools import combinations
 
 import numpy as np
 from numpy import ndarray
 
 
-def count_lines(data: ndarray[tuple[int, int], np.uint8]):
-    found = 0
-    for row in data:
-        should_count = True
-        for item in row:
-            if should_count and item == 1:
-                should_count = False
-                found += 1
-            elif item != 1:
-                should_count = True
-    return found
-
-
 class Garden:
-    def __init__(self, input_text: str):
-        self.grid = [list(map(ord, x)) for x in input_text.splitlines()]
-        self.size = len(self.grid[0]), len(self.grid)
-
-    def get_with_delta(self, pos, delta):
-        x, y = pos
-        dx, dy = delta
-        x += dx
-        y += dy
+    grid: ndarray[tuple[int, int], np.uint8]
+    labels: ndarray[tuple[int, int], np.int32]
+    count: int
 
+    def __init__(self, input_text: str):
+        self.grid = np.array([list(map(ord, x)) for x in input_text.splitlines()], dtype=np.uint8)
+        self.labels, self.count = self.label_regions()
+
+    @property
+    def size(self):
+        h, w = self.grid.shape
+        return w, h
+
+    def label_regions(self):
+        """
+        Union-find in one raster pass, joining each plot to its left and top neighbours of the same plant.
+        """
         w, h = self.size
-        if x < 0 or x >= w or y < 0 or y >= h:
-            return None, None
-        return (x, y), self.grid[y][x]
-
-
-class GardenExplorer:
-    visited: ndarray[tuple[int, int], np.uint8]
-    garden: Garden
-
-    def __init__(self, garden: Garden):
-        self.garden = garden
-
-        w, h = garden.size
-        self.visited = np.zeros(shape=(w, h), dtype=np.uint8)
-
-    def find_regions(self):
-        w, h = self.garden.size
-        for y in range(h):
-            for x in range(w):
-                if self.visited[y, x]:
-                    continue
-                yield self.explore_region((x, y))
-
-    def explore_region(self, pos: tuple[int, int]):
-        x, y = pos
-        w, h = self.garden.size
-        value = self.garden.grid[y][x]
-
-        self.visited[y, x] = 1
-        pos_to_explore = {pos}
-
-        area = 1
-        perimeter = 4
-
-        visited_in_session = {pos}
-        scan_line_shape = (w + 1, h + 1)
-        vertical_lines: ndarray[tuple[int, int], np.uint8] = np.zeros(shape=scan_line_shape, dtype=np.uint8)
-        horizontal_lines: ndarray[tuple[int, int], np.uint8] = np.zeros(shape=scan_line_shape, dtype=np.uint8)
-
-        min_x, max_x = x, x
-        min_y, max_y = y, y
-
-        vertical_lines[x, y] = 1
-        vertical_lines[x + 1, y] = 1
-        horizontal_lines[x, y] = 1
-        horizontal_lines[x, y + 1] = 1
-
-        while len(pos_to_explore) > 0:
-            next_pos_set = set()
-            for p in pos_to_explore:
-                for direction in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
-                    next_pos, next_value = self.garden.get_with_delta(p, direction)
-                    # invalid cord or not matching
-                    if next_value != value:
-                        continue
-                    x, y = next_pos
-                    if self.visited[y, x]:
-                        perimeter -= 1
-                        continue
-                    # not visited
-                    self.visited[y, x] = True
-                    next_pos_set.add(next_pos)
-                    visited_in_session.add(next_pos)
-                    perimeter += 3
-                    area += 1
-
-                    vertical_lines[x, y] += 1
-                    vertical_lines[x + 1, y] += 1
-                    horizontal_lines[x, y] += 1
-                    horizontal_lines[x, y + 1] += 1
-                    min_x, min_y = min(min_x, x), min(min_y, y)
-                    max_x, max_y = max(max_x, x), max(max_y, y)
-            pos_to_explore = next_pos_set
-
-        max_x += 2
-        max_y += 2
-
-        nh = horizontal_lines[min_x:max_x, min_y:max_y].transpose()
-        nv = vertical_lines[min_x:max_x, min_y:max_y]
-        sides = count_lines(nh) + count_lines(nv)
-
-        for ((x1, y1), (x2, y2)) in combinations(visited_in_session, 2):
-            dx = x2 - x1
-            dy = y2 - y1
-
-            # Check if the distance between two points is sqrt(2)
-            if dx * dx + dy * dy == 2:
-                p1 = (x1 + dx, y1)
-                p2 = (x1, y1 + dy)
-
-                # They break!
-                if p1 not in visited_in_session and p2 not in visited_in_session:
-                    sides += 2
-
-        return value, area, perimeter, sides
-
-
-def solve(input_path, verbose):
+        plants = self.grid.ravel().tolist()
+        parent = list(range(w * h))
+
+        def find(i: int):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, plant in enumerate(plants):
+            if i % w and plants[i - 1] == plant:
+                parent[find(i)] = find(i - 1)
+            if i >= w and plants[i - w] == plant:
+                a, b = find(i), find(i - w)
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+
+        # Flatten the forest, then renumber the roots in raster order.
+        roots = np.array(parent, dtype=np.int32)
+        while not np.array_equal(roots, next_roots := roots[roots]):
+            roots = next_roots
+        _, labels = np.unique(roots, return_inverse=True)
+        return labels.reshape(h, w).astype(np.int32), int(labels.max()) + 1
+
+    def region_stats(self):
+        """
+        Area, perimeter and sides of every region at once.
+        A region has as many sides as corners, counted for each plot in each of its four 2x2 windows.
+        """
+        padded = np.pad(self.labels, 1, constant_values=-1)
+        center = padded[1:-1, 1:-1]
+        h, w = center.shape
+
+        def shifted(dx: int, dy: int):
+            return padded[1 + dy:1 + dy + h, 1 + dx:1 + dx + w]
+
+        def count(mask: ndarray):
+            return np.bincount(center[mask], minlength=self.count)
+
+        area = np.bincount(center.ravel(), minlength=self.count)
+        perimeter = sum(count(shifted(dx, dy) != center) for (dx, dy) in [(1, 0), (0, 1), (-1, 0), (0, -1)])
+
+        sides = 0
+        for (dx, dy) in [(1, 1), (1, -1), (-1, 1), (-1, -1)]:
+            same_x = shifted(dx, 0) == center
+            same_y = shifted(0, dy) == center
+            same_diagonal = shifted(dx, dy) == center
+            outer = ~same_x & ~same_y
+            inner = same_x & same_y & ~same_diagonal
+            sides = sides + count(outer | inner)
+
+        return area, perimeter, sides
+
+    def plant_of_regions(self):
+        plants = np.zeros(self.count, dtype=np.uint8)
+        plants[self.labels.ravel()] = self.grid.ravel()
+        return plants
+
+
+def solve_parts(input_path, verbose):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip()
 
     garden = Garden(input_text)
-    p1 = 0
-    p2 = 0
-    for (value, a, p, s) in GardenExplorer(garden).find_regions():
-        verbose and print(f"Region {chr(value)}: area={a}, perimeter={p}, sides={s}")
-        p1 += a * p
-        p2 += a * s
-    print(f'p1: {p1}')
-    print(f'p2: {p2}')
+    area, perimeter, sides = garden.region_stats()
+    if verbose:
+        for (value, a, p, s) in zip(garden.plant_of_regions(), area, perimeter, sides):
+            print(f"Region {chr(value)}: area={a}, perimeter={p}, sides={s}")
+    yield 1, int(area @ perimeter)
+    yield 2, int(area @ sides)
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
     # parser.add_argument("-t", "--threads", type=int, default=max(cpu_count() - 1, 1))
-    args = parser.parse_args()
-    solve(args.input, args.verbose)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.verbose)
+
+
+def main():
+    for (part, price) in parts():
+        print(f'p{part}: {price}')
 
 
 if __name__ == "__main__":
@@ -1,11 +1,19 @@
 import argparse
 import re
 
+import numpy as np
+
 COST_A = 3
 COST_B = 1
 
 
+OFFSET_P2 = 10000000000000
+
+
 def parse(text: str):
+    """
+    All machines as rows of `x1, y1, x2, y2, xp, yp`.
+    """
     result = []
     btn_a = None
     btn_b = None
@@ -20,7 +28,7 @@ def parse(text: str):
         elif (m := re.match(r"Prize: X=(\d+), Y=(\d+)", line)) is not None:
             prize = (int(m.group(1)), int(m.group(2)))
             assert btn_a is not None and btn_b is not None
-            result.append((btn_a, btn_b, prize))
+            result.append((*btn_a, *btn_b, *prize))
             btn_a = btn_b = None
         else:
             assert line == "", f"unexpected line {line}"
@@ -28,47 +36,121 @@ def parse(text: str):
     return result
 
 
-def is_valid_count(count: float):
-    return count.is_integer() and count >= 0
-
-
-def try_solve(entry, offset):
-    (x1, y1), (x2, y2), (xp, yp) = entry
-
-    xp += offset
-    yp += offset
-
-    b = (y1 * xp - x1 * yp) / (x2 * y1 - x1 * y2)
-    a = (xp - b * x2) / x1
-    if is_valid_count(a) and is_valid_count(b):
-        return int(a), int(b)
-    return None
+def to_array(machines: list[tuple[int, ...]], max_offset: int):
+    # Cramer's numerators are `button * prize`, fall back to Python ints when they might not fit in int64.
+    largest = max((abs(v) for m in machines for v in m), default=0)
+    fits = 2 * largest * (largest + max_offset) < 1 << 63
+    return np.array(machines, dtype=np.int64 if fits else object).reshape(-1, 6)
+
+
+def min_cost_1d(u1: int, u2: int, up: int):
+    """
+    Cheapest `a * u1 + b * u2 = up` with `a, b >= 0`, or `None`.
+    """
+    if u1 == 0 and u2 == 0:
+        return 0 if up == 0 else None
+    if u1 == 0 or u2 == 0:
+        (u, cost) = (u2, COST_B) if u1 == 0 else (u1, COST_A)
+        return up // u * cost if up % u == 0 and up // u >= 0 else None
+
+    g, a0, b0 = extended_gcd(u1, u2)
+    if up % g:
+        return None
+    a0, b0 = a0 * (up // g), b0 * (up // g)
+    # a = a0 + k * da, b = b0 - k * db
+    da, db = u2 // g, u1 // g
+    if da < 0:
+        da, db = -da, -db
+
+    k = -(a0 // da)
+    if db > 0:
+        # Both buttons push the same way, `k` is bounded on both ends: take the cheaper end.
+        k_max = b0 // db
+        if k > k_max:
+            return None
+        if COST_A * da - COST_B * db < 0:
+            k = k_max
+    else:
+        # Opposite directions: the cost only grows with `k`, take the smallest that keeps `b >= 0`.
+        k = max(k, -(b0 // -db))
+    return COST_A * (a0 + k * da) + COST_B * (b0 - k * db)
+
+
+def extended_gcd(a: int, b: int):
+    # g = a * x + b * y
+    x0, x1, y0, y1 = 1, 0, 0, 1
+    while b:
+        q, a, b = a // b, b, a % b
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return a, x0, y0
+
+
+def solve_degenerate(machine):
+    x1, y1, x2, y2, xp, yp = map(int, machine)
+    # Collinear buttons: no solution unless the prize sits on the same line, then solve along one axis.
+    if x1 * yp - y1 * xp or x2 * yp - y2 * xp:
+        return None
+    if x1 or x2:
+        return min_cost_1d(x1, x2, xp)
+    return min_cost_1d(y1, y2, yp)
+
+
+def solve_batch(machines: np.ndarray, offsets: list[int]):
+    """
+    Cost of each machine for each offset (`0` when the prize can't be won), shape `(len(offsets), machines)`.
+    Solved with Cramer's rule, dividing only when the division is exact.
+    """
+    x1, y1, x2, y2, xp, yp = machines.T
+    det = x1 * y2 - x2 * y1
+    degenerate = det == 0
+    safe_det = np.where(degenerate, 1, det)
+
+    result = np.zeros((len(offsets), len(machines)), dtype=machines.dtype)
+    for (i, offset) in enumerate(offsets):
+        px = xp + offset
+        py = yp + offset
+        num_a = px * y2 - x2 * py
+        num_b = x1 * py - y1 * px
+        a = num_a // safe_det
+        b = num_b // safe_det
+        ok = ~degenerate & (num_a % safe_det == 0) & (num_b % safe_det == 0) & (a >= 0) & (b >= 0)
+        result[i] = np.where(ok, a * COST_A + b * COST_B, 0)
+
+        for j in np.flatnonzero(degenerate):
+            machine = machines[j].copy()
+            machine[4:] += offset
+            result[i, j] = solve_degenerate(machine) or 0
+    return result
 
 
-def solve(input_path, verbose):
+def solve_parts(input_path, verbose):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip()
 
-    data = parse(input_text)
+    machines = to_array(parse(input_text), OFFSET_P2)
+    for (part, offset) in enumerate((0, OFFSET_P2), 1):
+        costs = solve_batch(machines, [offset])[0]
+        verbose and print(f"offset {offset}: {np.count_nonzero(costs)} of {len(costs)} prizes won")
+        yield part, int(costs.sum())
 
-    answers = []
-    for offset in (0, 10000000000000):
-        answer = 0
-        for (a, b) in filter(bool, map(lambda x: try_solve(x, offset), data)):
-            answer += a * COST_A + b * COST_B
-        answers.append(answer)
-    p1, p2 = answers
-    print(f"p1: {p1}")
-    print(f"p2: {p2}")
 
-
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
     # parser.add_argument("-t", "--threads", type=int, default=max(cpu_count() - 1, 1))
-    args = parser.parse_args()
-    solve(args.input, args.verbose)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.verbose)
+
+
+def main():
+    for (part, cost) in parts():
+        print(f"p{part}: {cost}")
 
 
 if __name__ == "__main__":
@@ -5,10 +5,7 @@ import re
 from functools import reduce
 
 import numpy as np
-
-
-def add_mod(a, b, m):
-    return (a + b) % m
+from numpy import ndarray
 
 
 class Grid:
@@ -22,108 +19,237 @@ class Grid:
         self.w, self.h = w, h
         self.mid_w, self.mid_h = math.floor(w / 2), math.floor(h / 2)
 
-    def get_board(self, bots: list['Robot']):
-        grid = [[0] * self.w for _ in range(self.h)]
-        for bot in bots:
-            grid[bot.y][bot.x] += 1
+    def get_board(self, x: ndarray, y: ndarray):
+        grid = np.zeros((self.h, self.w), dtype=np.int64)
+        np.add.at(grid, (y, x), 1)
 
-        return '\n'.join([''.join([np.base_repr(x, 36) if x else '.' for x in row]) for row in grid])
+        return '\n'.join([''.join([np.base_repr(v, 36) if v else '.' for v in row]) for row in grid])
 
-    def get_christmas_tree(self, bots: list['Robot']):
+    def get_christmas_tree(self, x: ndarray, y: ndarray):
         grid = [[' '] * self.w for _ in range(self.h)]
-        for bot in bots:
-            grid[bot.y][bot.x] = '.'
+        for (bx, by) in zip(x, y):
+            grid[by][bx] = '.'
 
         return '\n'.join([''.join(row) for row in grid])
 
-    @staticmethod
-    def all_unique(bots: list['Robot']):
-        return len(set(map(lambda b: (b.x, b.y), bots))) == len(bots)
+    def all_unique(self, x: ndarray, y: ndarray):
+        return len(np.unique(y * self.w + x)) == len(x)
+
+    def quad_index(self, x: ndarray, y: ndarray):
+        # 0-3 for the quadrants, 4 for robots in the mid.
+        is_left = (x < self.mid_w).astype(np.int64)
+        is_top = (y < self.mid_h).astype(np.int64)
+        return np.where((x == self.mid_w) | (y == self.mid_h), 4, (is_left << 1) + is_top)
+
+    def split_quad(self, x: ndarray, y: ndarray):
+        return np.bincount(self.quad_index(x, y), minlength=5)[:4].tolist()
 
-    def split_quad(self, bots: list['Robot']):
-        result = [0] * 4
-        for bot in bots:
-            if bot.x == self.mid_w or bot.y == self.mid_h:
-                continue # in the mid
 
-            is_left = int(bot.x < self.mid_w)
-            is_top = int(bot.y < self.mid_h)
-            result[(is_left << 1) + is_top] += 1
-        return result
+METRICS_DTYPE = np.dtype([
+    ('t', np.int64),
+    ('safety', np.int64),
+    ('distinct', np.int64),
+    ('unique', np.bool_),
+    ('entropy', np.float64),
+    ('var_x', np.float64),
+    ('var_y', np.float64),
+])
 
-class Robot:
+
+class Robots:
+    """
+    Every robot at once: position at time `t` is `(p + v * t) mod (w, h)`, no simulation needed.
+    """
     grid: Grid
-    x: int
-    y: int
-    vx: int
-    vy: int
-
-    def __init__(self, grid: Grid, position: tuple[int, int], velocity: tuple[int, int]):
-        x, y = position
-        vx, vy = velocity
-        self.x = x
-        self.y = y
-        self.vx = vx
-        self.vy = vy
+    px: ndarray
+    py: ndarray
+    vx: ndarray
+    vy: ndarray
+
+    def __init__(self, grid: Grid, robots: list[tuple[int, int, int, int]]):
         self.grid = grid
+        data = np.array(robots, dtype=np.int64).reshape(-1, 4)
+        self.px, self.py, self.vx, self.vy = data.T
+
+    def __len__(self):
+        return len(self.px)
+
+    def x_at(self, t: int | ndarray):
+        # A scalar `t` gives one position per robot, an array of times gives a `(times, robots)` matrix.
+        t = np.asarray(t, dtype=np.int64)[..., np.newaxis]
+        return (self.px + self.vx * t) % self.grid.w
+
+    def y_at(self, t: int | ndarray):
+        t = np.asarray(t, dtype=np.int64)[..., np.newaxis]
+        return (self.py + self.vy * t) % self.grid.h
+
+    def at(self, t: int):
+        return self.x_at(t), self.y_at(t)
+
+    def unique_ticks(self, start: int, stop: int, chunk: int = 256):
+        """
+        Every `t` in `[start, stop)` with no two robots on the same tile.
+        """
+        for t0 in range(start, stop, chunk):
+            times = np.arange(t0, min(t0 + chunk, stop))
+            keys = self.y_at(times) * self.grid.w + self.x_at(times)
+            keys.sort(axis=1)
+            unique = ~(keys[:, 1:] == keys[:, :-1]).any(axis=1)
+            yield from times[unique].tolist()
+
+    def find_unique(self, start: int, stop: int):
+        return next(self.unique_ticks(start, stop), None)
+
+    def window_metrics(self, start: int, stop: int, chunk: int = 256, block: int = 8):
+        """
+        Metrics of every tick in `[start, stop)`, yielded `chunk` ticks at a time (as `METRICS_DTYPE` rows),
+        so memory stays at `chunk * robots` whatever the window is.
+
+        - safety: product of the robots per quadrant (part 1).
+        - distinct / unique: tiles with a robot, and whether no two robots share one.
+        - entropy: of the robots over `block * block` areas, in bits. Lower is more clustered.
+        - var_x / var_y: variance of the positions per axis.
+        """
+        w, h = self.grid.w, self.grid.h
+        n = len(self)
+        blocks_w, blocks_h = -(-w // block), -(-h // block)
+
+        for t0 in range(start, stop, chunk):
+            times = np.arange(t0, min(t0 + chunk, stop))
+            rows = np.arange(len(times))[:, np.newaxis]
+            x, y = self.x_at(times), self.y_at(times)
+            result = np.zeros(len(times), dtype=METRICS_DTYPE)
+            result['t'] = times
+
+            # One bincount for the whole chunk, each tick gets its own range of bins.
+            quads = np.bincount((rows * 5 + self.grid.quad_index(x, y)).ravel(), minlength=len(times) * 5)
+            result['safety'] = quads.reshape(-1, 5)[:, :4].prod(axis=1)
 
-    def move(self):
-        self.x = add_mod(self.x, self.vx, self.grid.w)
-        self.y = add_mod(self.y, self.vy, self.grid.h)
+            keys = y * w + x
+            keys.sort(axis=1)
+            result['distinct'] = 1 + (keys[:, 1:] != keys[:, :-1]).sum(axis=1) if n else 0
+            result['unique'] = result['distinct'] == n
 
+            areas = (y // block) * blocks_w + x // block
+            counts = np.bincount((rows * blocks_w * blocks_h + areas).ravel(), minlength=len(times) * blocks_w * blocks_h)
+            p = counts.reshape(len(times), -1) / max(n, 1)
+            result['entropy'] = -(p * np.log2(p, where=p > 0, out=np.zeros_like(p))).sum(axis=1)
 
-def parse(text: str, grid: Grid):
+            result['var_x'] = x.var(axis=1)
+            result['var_y'] = y.var(axis=1)
+            yield result
+
+    def find_tree(self):
+        """
+        x repeats every `w` ticks and y every `h` ticks, so find the tick where each axis clusters the most
+        (lowest variance) on its own, then combine them with the Chinese remainder theorem.
+        """
+        w, h = self.grid.w, self.grid.h
+        if math.gcd(w, h) != 1:
+            return None
+        tx = int(np.argmin(self.x_at(np.arange(w)).var(axis=1)))
+        ty = int(np.argmin(self.y_at(np.arange(h)).var(axis=1)))
+        return tx + w * ((ty - tx) * pow(w, -1, h) % h)
+
+
+def parse(text: str):
     result = []
     for m in re.finditer(r'p=(-?\d+),(-?\d+) v=(-?\d+),(-?\d+)', text):
         # position, velocity
-        p = int(m.group(1)), int(m.group(2))
-        v = int(m.group(3)), int(m.group(4))
-        result.append(Robot(grid, p, v))
+        result.append(tuple(map(int, m.groups())))
     return result
 
 
-def solve(input_path, verbose, grid_size):
+def write_metrics(chunks, path: str):
+    """
+    Stream metric chunks to a CSV file, one row per tick.
+    """
+    with open(path, "w", encoding='utf-8') as file:
+        file.write(','.join(METRICS_DTYPE.names) + '\n')
+        for chunk in chunks:
+            np.savetxt(file, chunk, delimiter=',', fmt=['%d', '%d', '%d', '%d', '%.6f', '%.3f', '%.3f'])
+
+
+def plot_metrics(csv_path: str, path: str):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    data = np.genfromtxt(csv_path, delimiter=',', names=True)
+    names = [name for name in METRICS_DTYPE.names if name != 't']
+    fig, axes = plt.subplots(len(names), 1, sharex=True, figsize=(12, 2 * len(names)))
+    for (ax, name) in zip(axes, names):
+        ax.plot(data['t'], data[name], linewidth=0.5)
+        ax.set_ylabel(name)
+    axes[-1].set_xlabel('t')
+    fig.savefig(path)
+
+
+def solve_parts(input_path, verbose, grid_size, search, metrics_path=None, window=None, plot_path=None):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip()
 
-
     grid = Grid(grid_size)
-    robots = parse(input_text, grid)
+    robots = Robots(grid, parse(input_text))
 
-    for i in range(100):
-        for bot in robots:
-            bot.move()
-        if grid.all_unique(robots):
-            print(f'p2: {i} (early result)')
+    for t in robots.unique_ticks(1, 101):
+        print(f'p2: {t} (early result)')
 
-    verbose and print(grid.get_board(robots))
-    bot_quads = grid.split_quad(robots)
+    x, y = robots.at(100)
+    verbose and print(grid.get_board(x, y))
+    bot_quads = grid.split_quad(x, y)
     verbose and print(bot_quads)
-    p1 = reduce(operator.mul, bot_quads, 1)
-    print(f'p1: {p1}')
+    yield 1, reduce(operator.mul, bot_quads, 1)
 
+    # Every robot is back to its start after w * h ticks.
+    cycle = grid.w * grid.h
+    p2 = robots.find_tree() if search == 'crt' else None
+    if p2 is not None and (p2 <= 100 or not grid.all_unique(*robots.at(p2))):
+        verbose and print(f'clustered at {p2}, but robots overlap: scan instead')
+        p2 = None
+    if p2 is not None and (earlier := robots.find_unique(101, p2)) is not None:
+        # The clustered tick is only an upper bound, the answer is the first tick without overlaps.
+        verbose and print(f'clustered at {p2}, but no robots overlap at {earlier} already')
+        p2 = earlier
+    if p2 is None:
+        p2 = robots.find_unique(101, cycle + 101)
 
-    p2 = 100
-    while True:
-        p2 += 1
-        for bot in robots:
-            bot.move()
-        if grid.all_unique(robots):
-            verbose and print(f'----- i: {p2} -----')
-            verbose and print(grid.get_christmas_tree(robots))
-            break
-    print(f'p2: {p2}')
+    if p2 is not None:
+        verbose and print(f'----- i: {p2} -----')
+        verbose and print(grid.get_christmas_tree(*robots.at(p2)))
+    yield 2, p2
 
+    if metrics_path:
+        start, stop = window or (0, cycle)
+        write_metrics(robots.window_metrics(start, stop), metrics_path)
+        plot_path and plot_metrics(metrics_path, plot_path)
 
-def main():
+
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
     parser.add_argument("-W", "--width", type=int, default=11)
     parser.add_argument("-H", "--height", type=int, default=7)
+    parser.add_argument("-s", "--search", choices=("crt", "scan"), default="crt",
+                        help="Find the tree by clustering per axis + CRT, or scan for the first tick without overlaps")
+    parser.add_argument("-m", "--metrics", help="Write per-tick metrics of the window to this CSV file")
+    parser.add_argument("--window", type=int, nargs=2, metavar=("START", "STOP"),
+                        help="Ticks for --metrics (default: the whole w * h cycle)")
+    parser.add_argument("--plot", help="Plot the --metrics file to this image")
     # parser.add_argument("-t", "--threads", type=int, default=max(cpu_count() - 1, 1))
-    args = parser.parse_args()
-    solve(args.input, args.verbose, (args.width, args.height))
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.verbose, (args.width, args.height), args.search,
+                       args.metrics, args.window, args.plot)
+
+
+def main():
+    for (part, result) in parts():
+        print(f'p{part}: {result}')
 
 
 if __name__ == "__main__":
@@ -5,13 +5,6 @@ DOWN = ord('v')
 LEFT = ord('<')
 RIGHT = ord('>')
 
-dir_mapping = {
-    UP: (0, -1),
-    DOWN: (0, 1),
-    LEFT: (-1, 0),
-    RIGHT: (1, 0),
-}
-
 EMPTY = ord('.')
 WALL = ord('#')
 GOOD = ord('O')
@@ -27,16 +20,26 @@ widen_map = {
 
 
 class Grid:
-    data: list[list[int]]
-    position: tuple[int, int] = (-1, -1)
+    """
+    Warehouse in a flat `bytearray` (row stride `w`), the robot is an index into it.
+    The GPS sum is kept up to date by every push.
+    """
+    data: bytearray
+    position: int = -1
+    gps: int = 0
     size: tuple[int, int] = (0, 0)
+    # Direction -> index offset, only depends on the width.
+    deltas: dict[int, int]
     verbose: bool = False
 
     def __init__(self, grid: str, wide=False, verbose=False):
         self.verbose = verbose
-        self.data = []
-        for y, row in enumerate(grid.split('\n')):
-            grid_row: list[int] = []
+        self.data = bytearray()
+        rows = grid.split('\n')
+        # Already wide, widening again would only stretch the walls and leave rows of different widths.
+        wide = wide and chr(GOOD_LEFT) not in grid
+        for y, row in enumerate(rows):
+            grid_row = bytearray()
             for x, cell in enumerate(map(ord, row)):
                 if cell in (WALL, GOOD, EMPTY):
                     if wide:
@@ -44,196 +47,176 @@ class Grid:
                     else:
                         grid_row.append(cell)
                 elif cell == ROBOT:
-                    self.position = x * (2 if wide else 1), y
+                    self.position = len(self.data) + len(grid_row)
                     grid_row.append(EMPTY)
                     wide and grid_row.append(EMPTY)
                 elif cell in (GOOD_LEFT, GOOD_RIGHT):
                     grid_row.append(cell)
                 else:
                     raise ValueError(f"Invalid cell: {chr(cell)}")
-            self.data.append(grid_row)
-        self.size = len(self.data[0]), len(self.data)
-
-    def get_goods_at(self, x, y):
-        cell = self.data[y][x]
-        if cell == WALL:
-            return False
-        if cell == EMPTY:
-            return [] # no more goods to find
-        if cell == GOOD:
-            return [(x, y)]
-        if cell == GOOD_LEFT:
-            return [(x, y), (x + 1, y)]
-        if cell == GOOD_RIGHT:
-            return [(x, y), (x - 1, y)]
+            self.data.extend(grid_row)
+        self.size = len(self.data) // len(rows), len(rows)
+        if len(self.data) != self.size[0] * len(rows):
+            raise ValueError("Rows must have the same width")
+        w, _ = self.size
+        self.deltas = {UP: -w, DOWN: w, LEFT: -1, RIGHT: 1}
+        self.gps = self.get_gps()
 
     def move(self, direction: int):
         self.verbose and print(f'---------- Move   {chr(direction)}')
 
-        x, y = self.position
-        dx, dy = dir_mapping[direction]
-        next_robot_pos = x + dx, y + dy
-
-        discovered = set()
-        layers = []
-        search_nodes = {(x, y)}
-        while len(search_nodes) > 0:
-            next_search_nodes = set()
-            layer = []
-            for (x, y) in search_nodes:
-                match self.get_goods_at(x + dx, y + dy):
-                    case False:
-                        return # found wall
-                    case goods:
-                        for good in goods:
-                            if good not in discovered:
-                                discovered.add(good)
-                                layer.append(good)
-                                next_search_nodes.add(good)
-            layers.append(layer)
-            search_nodes = next_search_nodes
-
-        self.position = next_robot_pos
-        for layer in reversed(layers):
-            for (gx, gy) in sorted(layer, key=lambda p: p[0], reverse=dx > 0):
-                nx, ny = gx + dx, gy + dy
-                self.verbose and print(f'Good {gx, gy} -> {nx, ny}')
-                self.data[gy][gx], self.data[ny][nx] = self.data[ny][nx], self.data[gy][gx]
-
-    def find_goods_on_path(self, cache: set[tuple[int, int]], x, y, dx, dy):
-        if (x, y) in cache:
-            return
-
-        cell = self.data[y][x]
+        d = self.deltas[direction]
+        pos = self.position
+        cell = self.data[pos + d]
         if cell == WALL:
-            # raise ValueError("Can't walk due to wall on the way")
-            yield False
             return
-
         if cell == EMPTY:
+            self.position = pos + d
+        elif d in (-1, 1):
+            self.push_horizontal(pos, d)
+        elif cell == GOOD:
+            self.push_narrow(pos, d)
+        else:
+            self.push_wide(pos, d)
+
+    def push_horizontal(self, pos: int, d: int):
+        # The row of goods shifts over by one cell, in a single slice assignment.
+        data = self.data
+        if d > 0:
+            end = data.find(EMPTY, pos + 1)
+            if end == -1 or data.find(WALL, pos + 1, end) != -1:
+                return
+            data[pos + 2:end + 1] = data[pos + 1:end]
+            lo, hi = pos + 2, end + 1
+        else:
+            end = data.rfind(EMPTY, 0, pos)
+            if end == -1 or data.rfind(WALL, end, pos) != -1:
+                return
+            data[end:pos - 1] = data[end + 1:pos]
+            lo, hi = end, pos - 1
+        # Every good in the row moved one column.
+        self.gps += d * (data.count(GOOD, lo, hi) + data.count(GOOD_LEFT, lo, hi))
+        data[pos + d] = EMPTY
+        self.position = pos + d
+        self.verbose and print(f'Goods {pos + d}..{end} shifted by {d}')
+
+    def push_narrow(self, pos: int, d: int):
+        # A column of small goods: only the first and the last cell change.
+        data = self.data
+        end = pos + d
+        while data[end] == GOOD:
+            end += d
+        if data[end] != EMPTY:
             return
-
-        assert cell in (GOOD, GOOD_LEFT, GOOD_RIGHT), f"Invalid cell on path: {chr(cell)}"
-
-        nx, ny = x + dx, y + dy
-        # Good or moving left/right
-        if cell == GOOD or dy == 0:
-            yield x, y
-            yield from self.find_goods_on_path(cache, nx, ny, dx, dy)
-            return
-
-        # Special case: good with left/right parts, and we are moving up/down
-        adj_x_delta = 1 if cell == GOOD_LEFT else -1
-        nnx = nx + adj_x_delta
-
-        yield x, y
-        yield nnx, y
-
-        yield from self.find_goods_on_path(cache, nx, ny, dx, dy)
-
-        if self.data[ny][nx] != cell:
-            yield from self.find_goods_on_path(cache, nnx, ny, dx, dy)
-
-    def try_to_move(self, x, y, dx, dy, callbacks: list[callable]):
-        # Can we move this block?
-        cell = self.data[y][x]
-        if cell == WALL:
-            return False
-        if cell == EMPTY:
-            return True
-
-        assert cell in (GOOD, GOOD_LEFT, GOOD_RIGHT), f"Invalid cell on path: {chr(cell)}"
-
-        def move_block():
-            self.data[y + dy][x + dx], self.data[y][x] = self.data[y][x], self.data[y + dy][x + dx]
-
-        if cell == GOOD or dy == 0:
-            if self.try_to_move(x + dx, y + dy, dx, dy, callbacks):
-                callbacks.append(move_block)
-                return True
-            return False
-
-        # Special case: good with left/right parts, and we are moving up/down
-        if self.try_to_move(x + (1 if cell == GOOD_LEFT else -1), y, dx, dy, callbacks):
-            callbacks.append(move_block)
-            return True
-        return False
+        data[end] = GOOD
+        data[pos + d] = EMPTY
+        self.gps += self.score_at(end) - self.score_at(pos + d)
+        self.position = pos + d
+        self.verbose and print(f'Good {pos + d} -> {end}')
+
+    def push_wide(self, pos: int, d: int):
+        # Wide goods can push two goods each, BFS over their left halves.
+        data = self.data
+        first = pos + d if data[pos + d] == GOOD_LEFT else pos + d - 1
+        order = [first]
+        discovered = {first}
+        for left in order:  # grows while we iterate
+            for target in (left + d, left + 1 + d):
+                cell = data[target]
+                if cell == WALL:
+                    return
+                if cell == EMPTY:
+                    continue
+                good = target if cell == GOOD_LEFT else target - 1
+                if good not in discovered:
+                    discovered.add(good)
+                    order.append(good)
+
+        # Goods further away are discovered later, move them first.
+        for left in reversed(order):
+            self.verbose and print(f'Good {left} -> {left + d}')
+            data[left] = data[left + 1] = EMPTY
+            data[left + d] = GOOD_LEFT
+            data[left + d + 1] = GOOD_RIGHT
+        self.gps += len(order) * self.gps_to_score(0, 1 if d > 0 else -1)
+        self.position = pos + d
 
     @staticmethod
     def gps_to_score(x: int | float, y: int | float):
         return y * 100 + x
 
-    def get_gps(self):
-        w, h = self.size
+    def score_at(self, i: int):
+        y, x = divmod(i, self.size[0])
+        return self.gps_to_score(x, y)
 
+    def get_gps(self):
+        """
+        Full scan of the grid, `self.gps` has the same value at any time.
+        """
         result = 0
-        for y, row in enumerate(self.data):
-            for x, cell in enumerate(row):
-                if cell == GOOD or cell == GOOD_LEFT:
-                    result += self.gps_to_score(x, y)
-                elif cell == GOOD_LEFT:
-                    # result += self.gps_to_score(x=min(x, w - x - 2), y=min(y, h - y - 2))
-                    pass
-
+        for good in (GOOD, GOOD_LEFT):
+            i = self.data.find(good)
+            while i != -1:
+                result += self.score_at(i)
+                i = self.data.find(good, i + 1)
         return result
 
+    def snapshot(self):
+        return bytes(self.data), self.position, self.gps
+
+    def restore(self, snapshot: tuple[bytes, int, int]):
+        data, self.position, self.gps = snapshot
+        self.data = bytearray(data)
+
     def print(self):
-        grid = [row.copy() for row in self.data]
-        x, y = self.position
-        grid[y][x] = ROBOT
-        return '\n'.join([''.join(map(chr, row)) for row in grid])
+        w, h = self.size
+        grid = self.data.copy()
+        grid[self.position] = ROBOT
+        return '\n'.join(grid[y * w:(y + 1) * w].decode() for y in range(h))
 
 
 def parse(grid: str, moves: str):
     return grid, [ord(c) for c in moves if c in '<>v^']
 
 
-def solve(input_path, verbose):
+def solve_parts(input_path, verbose, gps_every: int = 0):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip().replace('\r', '')
 
     grid_text, moves = parse(*input_text.split('\n\n', maxsplit=1))
-#
-#     gg = Grid('''
-# ##########
-# ##...[]...
-# ##........
-# '''.strip())
-#     print(gg.print())
-#     print(gg.get_gps())
-#     return
-
-    g = Grid(grid_text, wide=False, verbose=verbose)
-    verbose and print(g.print())
-    for m in moves:
-        g.move(m)
-        verbose and print(g.print())
-    p1 = g.get_gps()
-    print(g.print())
-    print('-------------------')
-
-    g = Grid(grid_text, wide=True, verbose=verbose)
-    verbose and print(g.print())
-    for m in moves:
-        g.move(m)
-        verbose and print(g.print())
-    p2 = g.get_gps()
-    print(g.print())
 
-    print(f'p1: {p1}')
-    print(f'p2: {p2}')
+    for (part, wide) in enumerate((False, True), 1):
+        g = Grid(grid_text, wide=wide, verbose=verbose)
+        verbose and print(g.print())
+        for (i, m) in enumerate(moves, 1):
+            g.move(m)
+            verbose and print(g.print())
+            gps_every and i % gps_every == 0 and print(f'move {i}: gps={g.gps}')
+        print(g.print())
+        wide or print('-------------------')
+        yield part, g.gps
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("-g", "--gps-every", type=int, default=0, help="Print the GPS sum every N moves")
     # parser.add_argument("-W", "--width", type=int, default=11)
     # parser.add_argument("-H", "--height", type=int, default=7)
     # parser.add_argument("-t", "--threads", type=int, default=max(cpu_count() - 1, 1))
-    args = parser.parse_args()
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
     # , (args.width, args.height)
-    solve(args.input, args.verbose)
+    return solve_parts(args.input, args.verbose, args.gps_every)
+
+
+def main():
+    for (part, gps) in parts():
+        print(f'p{part}: {gps}')
 
 
 if __name__ == "__main__":
@@ -1,4 +1,6 @@
 import argparse
+from array import array
+from heapq import heappop, heappush
 
 import numpy as np
 from numpy import ndarray, dtype
@@ -57,67 +59,243 @@ class MazeGrid:
                     self.end = (x, y)
         self.grid = board
 
+    def contract(self):
+        return CorridorGraph(self)
+
+
+class CorridorGraph:
+    """
+    The maze with its corridors (open cells with exactly two open neighbours) folded into weighted edges.
+    Nodes are junctions, dead ends, start and end. Leaving node `n` facing `d` follows a single corridor,
+    so each state `n * 4 + d` has at most one edge out, and at most one edge in.
+    """
+    w: int
+    nodes: list[int]
+    node_index: dict[int, int]
+    next_state: array  # -1: wall ahead
+    edge_cost: array
+    edge_cells: list[list[int]]  # cells covered by the edge, the node it leaves excluded
+    incoming: array  # state of the edge arriving at a state, -1 for none
+
+    def __init__(self, grid: MazeGrid):
+        w, h = grid.size
+        self.w = w
+        walls = grid.grid.T.tobytes()
+        steps = [dy * w + dx for (dx, dy) in DELTAS]
+
+        def is_open(cell: int):
+            return walls[cell] != WALL
+
+        (sx, sy), (ex, ey) = grid.start, grid.end
+        keep = {sy * w + sx, ey * w + ex}
+        self.nodes = [
+            cell for cell in range(w * h)
+            if is_open(cell) and (cell in keep or sum(is_open(cell + step) for step in steps) != 2)
+        ]
+        self.node_index = {cell: i for (i, cell) in enumerate(self.nodes)}
+
+        states = len(self.nodes) * 4
+        self.next_state = array('q', [-1]) * states
+        self.edge_cost = array('q', [0]) * states
+        self.edge_cells = [[] for _ in range(states)]
+        self.incoming = array('q', [-1]) * states
+
+        for (i, node) in enumerate(self.nodes):
+            for direction in range(4):
+                cell = node + steps[direction]
+                if not is_open(cell):
+                    continue
+                heading = direction
+                cost = POINT_MAPPING[MOVE_FORWARD]
+                cells = [cell]
+                while cell not in self.node_index:
+                    # A corridor cell: keep going, or take the only turn there is.
+                    for (turn, turn_cost) in ((heading, 0),
+                                              (dir_rotate_right(heading), POINT_MAPPING[EVT_TURN_RIGHT]),
+                                              (dir_rotate_left(heading), POINT_MAPPING[EVT_TURN_LEFT])):
+                        if is_open(cell + steps[turn]):
+                            heading = turn
+                            cost += turn_cost + POINT_MAPPING[MOVE_FORWARD]
+                            break
+                    cell += steps[heading]
+                    cells.append(cell)
+
+                src = i * 4 + direction
+                dst = self.node_index[cell] * 4 + heading
+                self.next_state[src] = dst
+                self.edge_cost[src] = cost
+                self.edge_cells[src] = cells
+                self.incoming[dst] = src
+
 
 def solve_maze(grid: MazeGrid):
-    previous = {}
-    costs = {}
+    """
+    Dijkstra over flat states `(y * w + x) * 4 + direction`, with the cost of each state in an array.
+    `previous` keeps one bit per way into a state that reaches it at its best cost:
+    forward (1), turning right (2) or turning left (4).
+    """
+    w, h = grid.size
+    walls = grid.grid.T.tobytes()  # y-major, walls[y * w + x]
+    steps = [dy * w + dx for (dx, dy) in DELTAS]
+    inf = 1 << 62
 
-    work = [(0, *grid.start, DIR_E)]
+    costs = array('q', [inf]) * (w * h * 4)
+    previous = bytearray(w * h * 4)
+
+    sx, sy = grid.start
+    start = (sy * w + sx) * 4 + DIR_E
+    costs[start] = 0
+    ex, ey = grid.end
+    end_cell = ey * w + ex
+    best = inf
+
+    work = [(0, start)]
     while work:
-        cost, cx, cy, direction = work.pop(0)
-        curr_node = cx, cy, direction
-        dx, dy = DELTAS[direction]
-        for x, y, n_dir, n_cost in (cx + dx, cy + dy, direction, cost + 1), \
-                (cx, cy, dir_rotate_right(direction), cost + 1000), \
-                (cx, cy, dir_rotate_left(direction), cost + 1000):
-            if grid.grid[x, y] == WALL:
+        cost, state = heappop(work)
+        if cost > costs[state]:
+            continue  # stale entry
+        if cost > best:
+            break
+        cell, direction = divmod(state, 4)
+        if cell == end_cell:
+            best = cost
+
+        forward = cell + steps[direction]
+        for next_state, n_cost, bit in ((forward * 4 + direction, cost + 1, 1),
+                                        (cell * 4 + dir_rotate_right(direction), cost + 1000, 2),
+                                        (cell * 4 + dir_rotate_left(direction), cost + 1000, 4)):
+            if walls[next_state >> 2] == WALL:
                 continue
+            if n_cost < costs[next_state]:
+                costs[next_state] = n_cost
+                previous[next_state] = bit
+                heappush(work, (n_cost, next_state))
+            elif n_cost == costs[next_state]:
+                previous[next_state] |= bit
 
-            next_node = (x, y, n_dir)
-            if next_node not in costs or n_cost < costs[next_node]:
-                costs[next_node] = n_cost
-                previous[next_node] = [curr_node]
-                work.append((n_cost, x, y, n_dir))
-            elif n_cost == costs[next_node]:
-                previous[next_node].append(curr_node)
+    min_cost = min(costs[end_cell * 4 + d] for d in range(4))
+    work = [end_cell * 4 + d for d in range(4) if costs[end_cell * 4 + d] == min_cost]
 
+    # Walk the bits back from the end, every state at most once.
+    seen = bytearray(w * h * 4)
+    seats = bytearray(w * h)
+    for state in work:
+        seen[state] = 1
+    while work:
+        state = work.pop()
+        cell, direction = divmod(state, 4)
+        seats[cell] = 1
+        bits = previous[state]
+        for prev_state, bit in (((cell - steps[direction]) * 4 + direction, 1),
+                                (cell * 4 + dir_rotate_left(direction), 2),
+                                (cell * 4 + dir_rotate_right(direction), 4)):
+            if bits & bit and not seen[prev_state]:
+                seen[prev_state] = 1
+                work.append(prev_state)
+    seats[sy * w + sx] = 1
+    return min_cost, seats.count(1)
+
+
+def solve_graph(grid: MazeGrid, graph: CorridorGraph):
+    """
+    Same search as `solve_maze`, over the junction states of `graph`.
+    A forward move follows a whole corridor, the seats are the cells its edge covers.
+    """
+    states = len(graph.nodes) * 4
+    inf = 1 << 62
+    costs = array('q', [inf]) * states
+    previous = bytearray(states)
+
+    sx, sy = grid.start
+    start = graph.node_index[sy * graph.w + sx] * 4 + DIR_E
+    costs[start] = 0
     ex, ey = grid.end
+    end_node = graph.node_index[ey * graph.w + ex]
+    best = inf
+
+    work = [(0, start)]
+    while work:
+        cost, state = heappop(work)
+        if cost > costs[state]:
+            continue
+        if cost > best:
+            break
+        node, direction = divmod(state, 4)
+        if node == end_node:
+            best = cost
+
+        for next_state, n_cost, bit in ((graph.next_state[state], cost + graph.edge_cost[state], 1),
+                                        (node * 4 + dir_rotate_right(direction), cost + 1000, 2),
+                                        (node * 4 + dir_rotate_left(direction), cost + 1000, 4)):
+            if next_state < 0:
+                continue
+            if n_cost < costs[next_state]:
+                costs[next_state] = n_cost
+                previous[next_state] = bit
+                heappush(work, (n_cost, next_state))
+            elif n_cost == costs[next_state]:
+                previous[next_state] |= bit
 
-    # Find a list of keys from costs that are at the end
-    work = [k for k in [(ex, ey, d) for d in range(4)] if k in costs]
-    min_cost = min(costs[k] for k in work)  # take minimum cost
-    work = [k for k in work if costs[k] == min_cost]  # filter out non-optimal cost ones
+    min_cost = min(costs[end_node * 4 + d] for d in range(4))
+    work = [end_node * 4 + d for d in range(4) if costs[end_node * 4 + d] == min_cost]
 
-    nodes = {grid.start, grid.end}
+    seen = bytearray(states)
+    w, h = grid.size
+    seats = bytearray(w * h)
+    for state in work:
+        seen[state] = 1
     while work:
-        x, y, d = work.pop(0)
-        next_node = (x, y, d)
-        work.extend(previous[next_node])
-        previous[next_node] = []  # Don't bother with this node again
-        nodes = nodes.union({(x, y)})
-    seats = len(nodes)
-    return min_cost, seats
+        state = work.pop()
+        node, direction = divmod(state, 4)
+        bits = previous[state]
+        for prev_state, bit in ((graph.incoming[state], 1),
+                                (node * 4 + dir_rotate_left(direction), 2),
+                                (node * 4 + dir_rotate_right(direction), 4)):
+            if bits & bit and not seen[prev_state]:
+                seen[prev_state] = 1
+                work.append(prev_state)
+        if bits & 1:
+            for cell in graph.edge_cells[graph.incoming[state]]:
+                seats[cell] = 1
+    seats[sy * graph.w + sx] = 1
+    return min_cost, seats.count(1)
 
 
-def solve(input_path, verbose, grid_size):
+def solve_parts(input_path, verbose, grid_size, engine='graph'):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip().replace('\r', '')
     maze = MazeGrid(input_text)
-    p1, p2 = solve_maze(maze)
-    print("p1:", p1)
-    print("p2:", p2)
+    if engine == 'graph':
+        graph = maze.contract()
+        verbose and print(f'contracted {int((maze.grid == EMPTY).sum()) * 4} states to {len(graph.nodes) * 4}')
+        cost, seats = solve_graph(maze, graph)
+    else:
+        cost, seats = solve_maze(maze)
+    yield 1, cost
+    yield 2, seats
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("-e", "--engine", choices=("graph", "flat"), default="graph",
+                        help="Search the corridor-contracted graph, or every cell")
     # parser.add_argument("-W", "--width", type=int, default=11)
     # parser.add_argument("-H", "--height", type=int, default=7)
     # parser.add_argument("-t", "--threads", type=int, default=max(cpu_count() - 1, 1))
-    args = parser.parse_args()
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
     # , (args.width, args.height)
-    solve(args.input, args.verbose, None)
+    return solve_parts(args.input, args.verbose, None, args.engine)
+
+
+def main():
+    for (part, result) in parts():
+        print(f"p{part}:", result)
 
 
 if __name__ == "__main__":
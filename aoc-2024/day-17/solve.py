@@ -1,5 +1,7 @@
 import argparse
 import re
+from multiprocessing import Pool
+from os import cpu_count
 
 # 0  | ADV | COM      | DIV A, A, COM    | A = A / (2 ^ COM)
 # 1  | BXL | IMM      | XOR B, IMM       | OP1 = CONST
@@ -34,7 +36,7 @@ def letter(n: int):
     return chr(n + ord('A'))
 
 
-def simulate(code: list[int], reg_init: tuple[int, int, int] = (0, 0, 0)):
+def simulate(code: list[int], reg_init: tuple[int, int, int] = (0, 0, 0), tracing: bool = True):
     trace = []
     output = []
     regs: list[int] = [*reg_init]  # register A, B, C
@@ -52,30 +54,31 @@ def simulate(code: list[int], reg_init: tuple[int, int, int] = (0, 0, 0)):
         if opcode in (INST_ADV, INST_BDV, INST_CDV):
             reg_idx = DIV_MAPPING[opcode]
             op_value, op_name = read_combined_operand(code[pc + 1])
-            trace.append(f'{pc:02} | DIV {letter(reg_idx)}, A, {op_name} # A={regs[REG_A]}, {op_name}={op_value}')
+            tracing and trace.append(
+                f'{pc:02} | DIV {letter(reg_idx)}, A, {op_name} # A={regs[REG_A]}, {op_name}={op_value}')
 
-            regs[reg_idx] = regs[REG_A] // (2 ** op_value)
+            regs[reg_idx] = regs[REG_A] >> op_value
             pc += 2
         elif opcode == INST_BXL:
             op_imm = code[pc + 1]
-            trace.append(f'{pc:02} | XOR B, #{op_imm}')
+            tracing and trace.append(f'{pc:02} | XOR B, #{op_imm}')
 
             regs[REG_B] ^= op_imm
             pc += 2
         elif opcode == INST_BXC:
-            trace.append(f'{pc:02} | XOR B, C # B={regs[REG_B]}, C={regs[REG_C]}')
+            tracing and trace.append(f'{pc:02} | XOR B, C # B={regs[REG_B]}, C={regs[REG_C]}')
 
             regs[REG_B] ^= regs[REG_C]
             pc += 2  # "legacy" reason
         elif opcode == INST_BST:
             op_value, op_name = read_combined_operand(code[pc + 1])
             regs[REG_B] = op_value & 7
-            trace.append(f'{pc:02} | MOV B, {op_name} # {op_value} = {op_value & 7} mod 8')
+            tracing and trace.append(f'{pc:02} | MOV B, {op_name} # {op_value} = {op_value & 7} mod 8')
             pc += 2
         elif opcode == INST_JNZ:
             op_imm = code[pc + 1]
             taken = regs[REG_A] != 0
-            trace.append(f'{pc:02} | JNZ #{op_imm} # A={regs[REG_A]}, {"take" if taken else "miss"}')
+            tracing and trace.append(f'{pc:02} | JNZ #{op_imm} # A={regs[REG_A]}, {"take" if taken else "miss"}')
 
             if taken:
                 pc = op_imm
@@ -83,7 +86,7 @@ def simulate(code: list[int], reg_init: tuple[int, int, int] = (0, 0, 0)):
                 pc += 2
         elif opcode == INST_OUT:
             op_value, op_name = read_combined_operand(code[pc + 1])
-            trace.append(f'{pc:02} | WRITE {op_name} # {op_value} = {op_value & 7} mod 8')
+            tracing and trace.append(f'{pc:02} | WRITE {op_name} # {op_value} = {op_value & 7} mod 8')
             output.append(op_value & 7)
 
             pc += 2
@@ -91,6 +94,148 @@ def simulate(code: list[int], reg_init: tuple[int, int, int] = (0, 0, 0)):
     return regs, trace, output
 
 
+def compile_program(code: list[int], expected: list[int] | None = None):
+    """
+    Translate the program into Python source once, returns `run(a, b, c) -> (regs, output)`.
+    Code between jump targets becomes straight-line statements, `pc` is only checked on a jump.
+    With `expected`, the run stops as soon as the output stops matching it.
+    """
+    def combo(value: int):
+        return str(value) if value <= 3 else 'abc'[value - 4]
+
+    def translate(pc: int):
+        opcode = code[pc]
+        if opcode == INST_BXC:
+            return 'b ^= c'
+        if pc + 1 == size:
+            return f"raise IndexError('missing operand at {pc}')"
+        operand = code[pc + 1]
+        if opcode == INST_BXL:
+            return f'b ^= {operand}'
+        if operand == 7:
+            return f"raise ValueError('invalid combo operand 7 at {pc}')"
+        if opcode in (INST_ADV, INST_BDV, INST_CDV):
+            return f"{'abc'[DIV_MAPPING[opcode]]} = a >> {combo(operand)}"
+        if opcode == INST_BST:
+            return f'b = {combo(operand)} & 7'
+        if opcode == INST_OUT:
+            if expected is None:
+                return f'output.append({combo(operand)} & 7)'
+            return (f'output.append({combo(operand)} & 7)\n'
+                    f'            if len(output) > {len(expected)} or output[-1] != expected[len(output) - 1]:\n'
+                    f'                return [a, b, c], output')
+        raise ValueError(f'invalid opcode {opcode} at {pc}')
+
+    size = len(code)
+
+    # Blocks start at 0 and where jumps land, jumps can also land on odd addresses.
+    starts = {0}
+    reachable = set()
+    work = [0]
+    while work:
+        pc = work.pop()
+        if pc >= size or pc in reachable:
+            continue
+        reachable.add(pc)
+        if code[pc] == INST_JNZ and pc + 1 < size:
+            starts |= {pc + 2, code[pc + 1]} & set(range(size))
+            work.append(code[pc + 1])
+        work.append(pc + 2)
+
+    lines = [
+        'def run(a, b, c):',
+        '    output = []',
+        '    pc = 0',
+        '    while True:',
+    ]
+    for start in sorted(starts):
+        lines.append(f'        if pc == {start}:')
+        pc = start
+        while True:
+            if pc >= size:
+                lines.append('            return [a, b, c], output')
+                break
+            if pc != start and pc in starts:
+                lines.append(f'            pc = {pc}')
+                lines.append('            continue')
+                break
+            if code[pc] == INST_JNZ and pc + 1 < size:
+                target, fallthrough = code[pc + 1], pc + 2
+                lines.append('            if a:')
+                lines.extend([f'                pc = {target}', '                continue'] if target < size
+                             else ['                return [a, b, c], output'])
+                lines.extend([f'            pc = {fallthrough}', '            continue'] if fallthrough < size
+                             else ['            return [a, b, c], output'])
+                break
+            statement = translate(pc)
+            lines.append(f'            {statement}')
+            if statement.startswith('raise'):
+                break
+            pc += 2
+    lines.append('        return [a, b, c], output')
+
+    scope = {'expected': tuple(expected or ())}
+    exec(compile('\n'.join(lines), '<day-17 program>', 'exec'), scope)
+    run = scope['run']
+    run.source = '\n'.join(lines)
+    return run
+
+
+def find_quine(code: list[int], regs: tuple[int, int, int]):
+    """
+    Smallest A that makes the program print itself, assuming it prints once per `A >>= 3` until A is 0
+    (see README). The last output only depends on the top 3 bits of A, so fix A 3 bits at a time
+    from the last output back, trying the lowest octal digit first.
+    """
+    run = compile_program(code)
+    _, b, c = regs
+
+    def search(a: int, i: int):
+        if i < 0:
+            return a
+        for digit in range(8):
+            candidate = a * 8 + digit
+            if run(candidate, b, c)[1] == code[i:]:
+                if (result := search(candidate, i - 1)) is not None:
+                    return result
+        return None
+
+    result = search(0, len(code) - 1)
+    if result is not None and run(result, b, c)[1] != code:
+        return None
+    return result
+
+
+g_worker: tuple | None = None
+
+
+def init_worker(code: list[int], regs: tuple[int, int, int]):
+    global g_worker
+    g_worker = compile_program(code, expected=code), code, regs[1], regs[2]
+
+
+def brute_force_worker(span: tuple[int, int]):
+    run, code, b, c = g_worker
+    for a in range(*span):
+        if run(a, b, c)[1] == code:
+            return a
+    return None
+
+
+def brute_force_quine(code: list[int], regs: tuple[int, int, int], start: int, stop: int, threads: int,
+                      chunk_size: int = 1 << 14):
+    """
+    Try every A in `[start, stop)`, in chunks over a process pool; chunks come back in order, so the
+    first hit is the smallest.
+    """
+    chunks = [(lo, min(lo + chunk_size, stop)) for lo in range(start, stop, chunk_size)]
+    with Pool(threads, initializer=init_worker, initargs=(code, regs)) as pool:
+        for result in pool.imap(brute_force_worker, chunks):
+            if result is not None:
+                return result
+    return None
+
+
 def run_tests():
     # If register C contains 9, the program 2,6 would set register B to 1.
     regs, trace, output = simulate([2, 6], (0, 0, 9))
@@ -141,6 +286,14 @@ def run_tests():
     assert output == [0, 3, 5, 4, 3, 0]
     print('-' * 80)
 
+    # The compiled program agrees with the interpreter.
+    for (code, reg_init) in [([2, 6], (0, 0, 9)), ([5, 0, 5, 1, 5, 4], (10, 0, 0)),
+                             ([0, 1, 5, 4, 3, 0], (2024, 0, 9)), ([1, 7], (0, 29, 0)),
+                             ([4, 0], (0, 2024, 43690)), ([0, 3, 5, 4, 3, 0], (117440, 0, 0))]:
+        regs, _, output = simulate(code, reg_init, tracing=False)
+        assert compile_program(code)(*reg_init) == (regs, output)
+    print('compiled: ok')
+
 
 def parse(file: str):
     values = list(map(int, re.findall(r'\d+', file)))
@@ -149,7 +302,7 @@ def parse(file: str):
     return regs, code
 
 
-def solve(input_path, verbose, run_test):
+def solve_parts(input_path, verbose, run_test, brute_range: tuple[int, int] | None = None, threads: int = 1):
     if run_test:
         run_tests()
         return
@@ -157,28 +310,48 @@ def solve(input_path, verbose, run_test):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip().replace('\r', '')
 
-    regs, code = parse(input_text)
-    verbose and print(f'regs={regs}')
+    init_regs, code = parse(input_text)
+    verbose and print(f'regs={init_regs}')
     verbose and print(f'code={code}')
 
-    regs, trace, output = simulate(code, regs)
-    verbose and print('\n'.join(trace))
+    if verbose:
+        regs, trace, output = simulate(code, init_regs)
+        print('\n'.join(trace))
+    else:
+        regs, output = compile_program(code)(*init_regs)
     verbose and print(f'regs={regs}')
     verbose and print(f'output={output}')
 
-    p1 = ",".join(map(str, output))
-    print(f'p1: {p1}')
+    yield 1, ",".join(map(str, output))
 
-    print(f'p2: check solve.cpp')
+    p2 = find_quine(code, init_regs)
+    if p2 is None and brute_range:
+        verbose and print(f'3-bit search failed, brute force A in [{brute_range[0]}, {brute_range[1]})')
+        p2 = brute_force_quine(code, init_regs, *brute_range, threads)
+    if p2 is None and verbose:
+        print('no quine found' + (f' in [{brute_range[0]}, {brute_range[1]})' if brute_range else ', try --range'))
+    yield 2, p2
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-t", "--test", action="store_true")
     parser.add_argument("-v", "--verbose", action="store_true")
-    args = parser.parse_args()
-    solve(args.input, args.verbose, args.test)
+    parser.add_argument("-r", "--range", type=int, nargs=2, metavar=("START", "STOP"),
+                        help="Values of A to brute force when the 3-bit search doesn't apply (default: none)")
+    parser.add_argument("-j", "--threads", type=int, default=max(cpu_count() - 1, 1))
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.verbose, args.test, args.range and tuple(args.range), args.threads)
+
+
+def main():
+    for (part, result) in parts():
+        print(f'p{part}: {result}')
 
 
 if __name__ == "__main__":
@@ -1,7 +1,9 @@
 import argparse
+import sys
+from pathlib import Path
 
-import numpy as np
-from numpy import ndarray, dtype
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from grid_bfs import GridBFS
 
 EMPTY = ord(' ')
 WALL = ord('#')
@@ -24,82 +26,121 @@ class MazeGrid:
         self.end = (size[0] - 1, size[1] - 1)
 
 
-def solve_maze(grid: MazeGrid, lines: int) -> int:
-    previous: dict[tuple[int, int], list[tuple[int, int]]] = {}
-    costs = {}
+def solve_maze(grid: MazeGrid, lines: int, bfs: GridBFS | None = None) -> int:
     w, h = grid.size
+    bfs = bfs or GridBFS(grid.size)
 
-    walls = set(grid.walls[:lines])
+    walls = bytearray(w * h)
+    for (x, y) in grid.walls[:lines]:
+        walls[y * w + x] = 1
 
-    work: list[tuple[int, int, int]] = [(0, *grid.start)]
-    while work:
-        cost, cx, cy = work.pop(0)
-        curr_node = cx, cy
-        for x, y in ((cx + 1, cy), (cx, cy + 1,), (cx - 1, cy), (cx, cy - 1,)):
-            if x < 0 or x >= w or y < 0 or y >= h:
-                continue
+    bfs.run(walls, bfs.index(*grid.start))
+    return bfs.distance_at(*grid.end)
 
-            if (x, y) in walls:
-                continue
 
-            next_node: tuple[int, int] = (x, y)
-            n_cost = cost + 1
-            if next_node not in costs or n_cost < costs[next_node]:
-                costs[next_node] = n_cost
-                previous[next_node] = [curr_node]
-                work.append((n_cost, x, y))
-            elif n_cost == costs[next_node]:
-                previous[next_node].append(curr_node)
-
-    ex, ey = grid.end
-
-    # Debug map
-    # cost_board = np.zeros(grid.size, dtype=np.uint32)
-    # cost_board.fill(999)
-    # for ((x, y), cost) in costs.items():
-    #     cost_board[x, y] = cost
-    if (ex, ey) not in costs:
-        return -1
-
-    return costs[(ex, ey)]
-
-
-def solve(input_path, verbose, lines, grid_size):
-    with open(input_path, "r", encoding='utf-8') as file:
-        input_text = file.read().strip().replace('\r', '')
-
-    grid = MazeGrid(input_text, grid_size)
-    steps = solve_maze(grid, lines)
-    print(f"p1: {steps}")
-
-    # p2 binary search
+def first_blocking_byte(grid: MazeGrid) -> int | None:
+    """
+    Index of the first byte that cuts the start off the end, in one pass:
+    drop every byte, then lift them back in reverse order, joining freed cells with a union-find.
+    The first byte (going backwards) whose removal connects start and end is the one that blocked it.
+    """
+    w, h = grid.size
+    fallen_at = [len(grid.walls)] * (w * h)
+    for (i, (x, y)) in enumerate(grid.walls):
+        fallen_at[y * w + x] = min(fallen_at[y * w + x], i)
+
+    parent = list(range(w * h))
+
+    def find(i: int):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def free(cell: int):
+        x = cell % w
+        for (ok, neighbour) in ((x > 0, cell - 1), (x < w - 1, cell + 1), (cell >= w, cell - w),
+                                (cell < w * (h - 1), cell + w)):
+            if ok and fallen_at[neighbour] == len(grid.walls):
+                a, b = find(cell), find(neighbour)
+                if a != b:
+                    parent[a] = b
+
+    for cell in range(w * h):
+        if fallen_at[cell] == len(grid.walls):
+            free(cell)
+
+    (sx, sy), (ex, ey) = grid.start, grid.end
+    start, end = sy * w + sx, ey * w + ex
+    if fallen_at[start] == fallen_at[end] == len(grid.walls) and find(start) == find(end):
+        return None
+
+    for i in range(len(grid.walls) - 1, -1, -1):
+        x, y = grid.walls[i]
+        cell = y * w + x
+        if fallen_at[cell] != i:
+            continue  # fell on a tile that was already blocked
+        fallen_at[cell] = len(grid.walls)
+        free(cell)
+        if fallen_at[start] == fallen_at[end] == len(grid.walls) and find(start) == find(end):
+            return i
+    return None
+
+
+def solve_bisect(grid: MazeGrid) -> int | None:
+    # Smallest number of fallen bytes that blocks the path, the last of them is the answer.
+    bfs = GridBFS(grid.size)
     left = 0
     right = len(grid.walls)
-    mid: int = (left + right) // 2
     while left < right:
         mid = (left + right) // 2
-        steps = solve_maze(grid, mid)
+        steps = solve_maze(grid, mid, bfs)
         if steps == -1:
             right = mid
         else:
             left = mid + 1
 
-    for i in (mid - 1, mid, mid + 1):
-        solved = solve_maze(grid, i)
-        print(f'fall {i}: {solved} -> {grid.walls[i - 1]}')
-    p2 = ','.join(map(str, grid.walls[mid]))
-    print(f"p2: {p2}")
+    if left == 0 or solve_maze(grid, left, bfs) != -1:
+        return None
+    return left - 1
 
-def main():
+
+def solve_parts(input_path, verbose, lines, grid_size, engine='union-find'):
+    with open(input_path, "r", encoding='utf-8') as file:
+        input_text = file.read().strip().replace('\r', '')
+
+    grid = MazeGrid(input_text, grid_size)
+    yield 1, solve_maze(grid, lines)
+
+    index = first_blocking_byte(grid) if engine == 'union-find' else solve_bisect(grid)
+    if index is None:
+        yield 2, "never blocked"
+        return
+    verbose and print(f'fall {index + 1}: {solve_maze(grid, index + 1)} -> {grid.walls[index]}')
+    yield 2, ','.join(map(str, grid.walls[index]))
+
+
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
     parser.add_argument("-W", "--width", type=int, default=7)
     parser.add_argument("-H", "--height", type=int, default=7)
     parser.add_argument("-L", "--lines", type=int, default=12)
+    parser.add_argument("-e", "--engine", choices=("union-find", "bisect"), default="union-find",
+                        help="Find the first blocking byte with one reverse union-find pass, or a binary search of BFS")
     # parser.add_argument("-t", "--threads", type=int, default=max(cpu_count() - 1, 1))
-    args = parser.parse_args()
-    solve(args.input, args.verbose, args.lines, (args.width, args.height))
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.verbose, args.lines, (args.width, args.height), args.engine)
+
+
+def main():
+    for (part, result) in parts():
+        print(f"p{part}: {result}")
 
     # solve real input:
     # -L 1024 -W 71 -H 71 input.txt
@@ -28,7 +28,7 @@ def solve_towels_all(cache: dict[str, int], design: str, towels: tuple[str]) ->
     return total
 
 
-def solve(input_path, verbose):
+def solve_parts(input_path, verbose):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip().replace('\r', '')
 
@@ -37,20 +37,27 @@ def solve(input_path, verbose):
     # noinspection PyUnresolvedReferences
     towels: tuple[str] = tuple(towels.split(', '))
 
-    p1 = sum([1 for ok in filter(lambda design: solve_towels(design, towels), designs) if ok])
-    print(f"p1: {p1}")
+    yield 1, sum([1 for ok in filter(lambda design: solve_towels(design, towels), designs) if ok])
 
     cache = {}
-    p2 = sum([solve_towels_all(cache, design, towels) for design in designs])
-    print(f"p2: {p2}")
+    yield 2, sum([solve_towels_all(cache, design, towels) for design in designs])
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
-    args = parser.parse_args()
-    solve(args.input, args.verbose)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.verbose)
+
+
+def main():
+    for (part, result) in parts():
+        print(f"p{part}: {result}")
 
 
 if __name__ == "__main__":
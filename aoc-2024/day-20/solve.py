@@ -1,4 +1,13 @@
 import argparse
+import sys
+from array import array
+from pathlib import Path
+
+import numpy as np
+from numpy import ndarray
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from grid_bfs import GridBFS, UNREACHED
 
 EMPTY = ord(' ')
 WALL = ord('#')
@@ -6,8 +15,7 @@ WALL = ord('#')
 type Grid = list[list[int]]
 type Cord = tuple[int, int]  # x, y
 type Size = tuple[int, int]  # width, height
-type DijkstraCosts = dict[Cord, int]
-type DijkstraNodes = dict[Cord, list[Cord]]
+type Distances = array  # array('i'), flat y * w + x, UNREACHED for walls
 
 
 def parse_grid(input_text: str) -> tuple[Grid, Cord, Cord, Size]:
@@ -34,35 +42,11 @@ def parse_grid(input_text: str) -> tuple[Grid, Cord, Cord, Size]:
     return grid, start, end, size
 
 
-def dijkstra(grid: Grid, start: Cord, /, size: Size = None) -> tuple[DijkstraNodes, DijkstraCosts]:
-    previous: DijkstraNodes = {}
-    costs: DijkstraCosts = {}
+def race_distances(grid: Grid, start: Cord, /, size: Size = None) -> GridBFS:
     w, h = size if size else (len(grid[0]), len(grid))
-
-    work: list[tuple[int, int, int]] = [(0, *start)]
-    costs[start] = 0
-
-    while work:
-        prev_cost, cx, cy = work.pop(0)
-        prev_node = cx, cy
-        for x, y in ((cx + 1, cy), (cx, cy + 1,), (cx - 1, cy), (cx, cy - 1,)):
-            if not (0 <= x < w and 0 <= y < h):
-                continue
-
-            if grid[y][x] == WALL:
-                continue
-
-            cost = prev_cost + 1
-            node: Cord = (x, y)
-
-            if node not in costs or cost < costs[node]:
-                costs[node] = cost
-                previous[node] = [prev_node]
-                work.append((cost, x, y))
-            elif cost == costs[node]:
-                previous[node].append(prev_node)
-
-    return previous, costs
+    walls = bytes(c == WALL for row in grid for c in row)
+    bfs = GridBFS((w, h))
+    return bfs.run(walls, bfs.index(*start))
 
 
 def iter_cross(n: int):
@@ -102,9 +86,10 @@ def calc_steps_saved(steps: int, cost_start: int, cost_end: int) -> int:
         return cost_end - (cost_start + steps)
 
 
-def solve_ex(grid: Grid, costs: DijkstraCosts, /, verbose: bool, threshold: int, time: int) -> int:
+def solve_ex(grid: Grid, distances: Distances, /, verbose: bool, threshold: int, time: int) -> int:
     print(f'solve for {time=} {threshold=}')
     good = 0
+    w, h = len(grid[0]), len(grid)
 
     search_window = set(iter_cross(time))
     for y, row in enumerate(grid):
@@ -112,9 +97,12 @@ def solve_ex(grid: Grid, costs: DijkstraCosts, /, verbose: bool, threshold: int,
             if c == WALL: continue
 
             # Find 2 free space within the search window
-            cost_start = costs[x, y]
+            cost_start = distances[y * w + x]
             for (dx, dy) in search_window:
-                if (cost_exit := costs.get((x + dx, y + dy), None)) is not None:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < w and 0 <= ny < h):
+                    continue
+                if (cost_exit := distances[ny * w + nx]) != UNREACHED:
                     steps = abs(dx) + abs(dy)
 
                     # Check if we actually make some "good" savings
@@ -125,27 +113,144 @@ def solve_ex(grid: Grid, costs: DijkstraCosts, /, verbose: bool, threshold: int,
     return good
 
 
-def solve(input_path, verbose, p2_threshold):
+def solve_numpy(distances: ndarray, /, verbose: bool, threshold: int, time: int) -> int:
+    """
+    Same count as `solve_ex`, one offset of the search window at a time:
+    compare the whole distance field with itself shifted by the offset.
+    """
+    verbose and print(f'solve for {time=} {threshold=} (numpy)')
+    h, w = distances.shape
+    good = 0
+    for (dx, dy) in iter_cross(time):
+        if dy >= h or abs(dx) >= w:
+            continue
+        # a: cells (x, y), b: cells (x + dx, y + dy)
+        a = distances[:h - dy, max(0, -dx):w - max(0, dx)]
+        b = distances[dy:, max(0, dx):w - max(0, -dx)]
+        saved = np.abs(a - b) - (abs(dx) + abs(dy))
+        good += int(np.count_nonzero((saved >= threshold) & (a != UNREACHED) & (b != UNREACHED)))
+    return good
+
+
+def track_cells(distances: ndarray):
+    """
+    `(x, y, cost)` of every track cell, in the order the race visits them.
+    """
+    ys, xs = np.nonzero(distances != UNREACHED)
+    costs = distances[ys, xs].astype(np.int64)
+    order = np.argsort(costs, kind='stable')
+    return xs[order].astype(np.int64), ys[order].astype(np.int64), costs[order]
+
+
+class CheatHistogram:
+    """
+    Every cheat of up to `radius` steps, as `counts[steps, saved]` (savings < 0 are dropped).
+    Any threshold and any radius up to `radius` is a sum over it, without scanning the track again.
+    """
+    radius: int
+    counts: ndarray
+
+    def __init__(self, distances: ndarray, radius: int, flush: int = 1 << 22):
+        self.radius = radius
+        xs, ys, costs = track_cells(distances)
+        width = int(costs[-1]) + 1 if len(costs) else 1
+        self.counts = np.zeros((radius + 1, width), dtype=np.int64)
+
+        # Bucket the track by `radius * radius` squares: a cheat stays within the neighbouring buckets.
+        size = max(radius, 1)
+        bx, by = xs // size, ys // size
+        buckets_w = int(bx.max()) + 2 if len(xs) else 1
+        bucket = by * buckets_w + bx
+        order = np.argsort(bucket, kind='stable')  # stays in path order within a bucket
+        xs, ys, costs, bucket = xs[order], ys[order], costs[order], bucket[order]
+        occupied, starts, lengths = np.unique(bucket, return_index=True, return_counts=True)
+        spans = {int(b): (int(i), int(i + n)) for (b, i, n) in zip(occupied, starts, lengths)}
+
+        keys = []
+        pending = 0
+        for (b, (i0, i1)) in spans.items():
+            # Each pair of buckets once: itself, right, and the three below.
+            for nb in (b, b + 1, b + buckets_w - 1, b + buckets_w, b + buckets_w + 1):
+                if nb not in spans:
+                    continue
+                j0, j1 = spans[nb]
+                steps = (np.abs(xs[i0:i1, np.newaxis] - xs[np.newaxis, j0:j1])
+                         + np.abs(ys[i0:i1, np.newaxis] - ys[np.newaxis, j0:j1]))
+                saved = np.abs(costs[i0:i1, np.newaxis] - costs[np.newaxis, j0:j1]) - steps
+                keep = (steps <= radius) & (saved >= 0)
+                if nb == b:
+                    keep &= np.tri(i1 - i0, j1 - j0, -1, dtype=np.bool_).T  # i < j
+                keys.append(steps[keep] * width + saved[keep])
+                pending += len(keys[-1])
+                if pending >= flush:
+                    self._add(keys)
+                    keys, pending = [], 0
+        self._add(keys)
+
+    def _add(self, keys: list[ndarray]):
+        if keys:
+            flat = self.counts.reshape(-1)
+            flat += np.bincount(np.concatenate(keys), minlength=len(flat))
+
+    def savings(self, radius: int | None = None):
+        """
+        Number of cheats per picoseconds saved, with at most `radius` steps.
+        """
+        radius = self.radius if radius is None else radius
+        assert radius <= self.radius, f"histogram only goes up to {self.radius} steps"
+        return self.counts[1:radius + 1].sum(axis=0)
+
+    def count(self, threshold: int, radius: int | None = None) -> int:
+        return int(self.savings(radius)[max(threshold, 0):].sum())
+
+
+def solve_parts(input_path, verbose, p2_threshold, engine='numpy', histogram=False):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip().replace('\r', '')
 
     grid, start, end, size = parse_grid(input_text)
-    _, costs = dijkstra(grid, start, size=size)
-    assert end in costs, f"Can't reach end {end}"
-
-    p1 = solve_ex(grid, costs, verbose=verbose, threshold=100, time=2)
-    print(f'p1: {p1}')
-    p2 = solve_ex(grid, costs, verbose=verbose, threshold=p2_threshold, time=20)
-    print(f'p2: {p2}')
+    bfs = race_distances(grid, start, size=size)
+    assert bfs.distance_at(*end) != UNREACHED, f"Can't reach end {end}"
+
+    if engine == 'path' or histogram:
+        cheats = CheatHistogram(bfs.as_numpy(), radius=20)
+        verbose and print(f'histogram: {int(cheats.counts.sum())} cheats up to {cheats.radius} steps')
+        if histogram:
+            savings = cheats.savings()
+            for saved in np.flatnonzero(savings[max(p2_threshold, 0):]) + max(p2_threshold, 0):
+                print(f'{savings[saved]} cheats save {saved} picoseconds')
+
+    if engine == 'path':
+        yield 1, cheats.count(threshold=100, radius=2)
+        yield 2, cheats.count(threshold=p2_threshold, radius=20)
+    elif engine == 'numpy':
+        distances = bfs.as_numpy()
+        yield 1, solve_numpy(distances, verbose=verbose, threshold=100, time=2)
+        yield 2, solve_numpy(distances, verbose=verbose, threshold=p2_threshold, time=20)
+    else:
+        yield 1, solve_ex(grid, bfs.distance, verbose=verbose, threshold=100, time=2)
+        yield 2, solve_ex(grid, bfs.distance, verbose=verbose, threshold=p2_threshold, time=20)
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
     parser.add_argument("--threshold", type=int, default=50, help="Threshold (p2)")
-    args = parser.parse_args()
-    solve(args.input, args.verbose, args.threshold)
+    parser.add_argument("-e", "--engine", choices=("numpy", "path", "scan"), default="numpy")
+    parser.add_argument("--histogram", action="store_true",
+                        help="Print the number of 20 steps cheats per saving, from the threshold up")
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, args.verbose, args.threshold, args.engine, args.histogram)
+
+
+def main():
+    for (part, cheats) in parts():
+        print(f'p{part}: {cheats}')
 
 
 if __name__ == "__main__":
@@ -43,25 +43,32 @@ def solve_ex(codes: list[str], count: int) -> int:
     return sum([solve_code(code, count) * int(code[:-1]) for code in codes])
 
 
-def solve(input_path: str, /, **_kwargs):
+def solve_parts(input_path: str, /, **_kwargs):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip().replace('\r', '').splitlines()
 
-    p1 = solve_ex(input_text, 2)
-    print(f'p1: {p1}')
-    p2 = solve_ex(input_text, 25)
-    print(f'p2: {p2}')
+    yield 1, solve_ex(input_text, 2)
+    yield 2, solve_ex(input_text, 25)
 
 
-def main():
-    global g_verbose
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
     parser.add_argument("--threshold", type=int, default=50, help="Threshold (p2)")
-    args = parser.parse_args()
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    global g_verbose
+    args = get_parser().parse_args(argv)
     g_verbose = args.verbose
-    solve(args.input)
+    return solve_parts(args.input)
+
+
+def main():
+    for (part, cost) in parts():
+        print(f'p{part}: {cost}')
 
 
 if __name__ == "__main__":
@@ -44,7 +44,7 @@ def solve_deltas(delta_list: list[dict[int, int]]):
     return best_score
 
 
-def solve(input_path: str, /, **_kwargs):
+def solve_parts(input_path: str, /, **_kwargs):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip().replace('\r', '').splitlines()
 
@@ -55,18 +55,26 @@ def solve(input_path: str, /, **_kwargs):
         secret, delta_data = derive_secret_at(seed, 2000)
         p1 += secret
         deltas.append(delta_data)
-    print(f'p1: {p1}')
+    yield 1, p1
 
-    p2 = solve_deltas(deltas)
-    print(f'p2: {p2}')
+    yield 2, solve_deltas(deltas)
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
-    args = parser.parse_args()
-    solve(args.input, verbose=args.verbose)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, verbose=args.verbose)
+
+
+def main():
+    for (part, result) in parts():
+        print(f'p{part}: {result}')
 
 
 if __name__ == "__main__":
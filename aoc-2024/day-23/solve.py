@@ -49,7 +49,7 @@ class Network:
                 work = next_work
 
 
-def solve(input_path: str, /, **_kwargs):
+def solve_parts(input_path: str, /, **_kwargs):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip().replace('\r', '')
 
@@ -57,22 +57,29 @@ def solve(input_path: str, /, **_kwargs):
 
     names_with_t = [name for name in network.get_names() if name.startswith('t')]
     network.build_network_for(names_with_t)
-    p1 = len(network.get_complete_network_with_n_nodes(3))
-    print(f'p1 = {p1}')
+    yield 1, len(network.get_complete_network_with_n_nodes(3))
 
     largest_networks = network.get_largest_networks()
     assert len(largest_networks) == 1, "p2 solution should have a single, unique answer"
 
-    p2 = ','.join(largest_networks[0])
-    print(f'p2 = {p2}')
+    yield 2, ','.join(largest_networks[0])
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
-    args = parser.parse_args()
-    solve(args.input, verbose=args.verbose)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, verbose=args.verbose)
+
+
+def main():
+    for (part, result) in parts():
+        print(f'p{part} = {result}')
 
 
 if __name__ == "__main__":
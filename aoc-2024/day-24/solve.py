@@ -117,28 +117,35 @@ class PlugBoard:
         return replaced
 
 
-def solve(input_path: str, /, verbose=False, **_kwargs):
+def solve_parts(input_path: str, /, verbose=False, **_kwargs):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip().replace('\r', '')
 
     pb = PlugBoard(input_text, verbose)
     z_names = [n for n in sorted(pb.names, reverse=True) if n.startswith('z')]
-    p1 = pb.simulate(z_names)
-    print(f'p1: {p1}')
+    yield 1, pb.simulate(z_names)
 
     replacements = pb.fix_machine()
     assert len(replacements) == 8
 
-    p2 = ','.join(sorted(replacements))
-    print(f'p2: {p2}')
+    yield 2, ','.join(sorted(replacements))
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
-    args = parser.parse_args()
-    solve(args.input, verbose=args.verbose)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, verbose=args.verbose)
+
+
+def main():
+    for (part, result) in parts():
+        print(f'p{part}: {result}')
 
 
 if __name__ == "__main__":
@@ -18,7 +18,7 @@ def parse(text: str):
     return locks, keys
 
 
-def solve(input_path: str, /, verbose=False, **_kwargs):
+def solve_parts(input_path: str, /, verbose=False, **_kwargs):
     with open(input_path, "r", encoding='utf-8') as file:
         input_text = file.read().strip().replace('\r', '')
 
@@ -31,17 +31,25 @@ def solve(input_path: str, /, verbose=False, **_kwargs):
             if all(l + k <= 5 for l, k in zip(lock, key)):
                 verbose and print(f'{lock=} {key=}')
                 p1 += 1
-    print(f'p1: {p1}')
-
-    print(f'p2: N/A')
+    yield 1, p1
 
 
-def main():
+def get_parser():
     parser = argparse.ArgumentParser()
     parser.add_argument("input", nargs="?", default="sample.txt")
     parser.add_argument("-v", "--verbose", action="store_true")
-    args = parser.parse_args()
-    solve(args.input, verbose=args.verbose)
+    return parser
+
+
+def parts(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    return solve_parts(args.input, verbose=args.verbose)
+
+
+def main():
+    for (part, result) in parts():
+        print(f'p{part}: {result}')
+    print(f'p2: N/A')
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+"""
+Unit-weight BFS over a flat grid, shared by the maze days (18, 20).
+
+Cells are indexed `y * w + x`. The queue is a preallocated `array` (every cell is queued at most once),
+distances live in an `array('i')` with `-1` for unreached cells, and both are reused between runs.
+"""
+from array import array
+
+import numpy as np
+
+UNREACHED = -1
+
+
+class GridBFS:
+    w: int
+    h: int
+    distance: array
+    previous: array | None
+
+    def __init__(self, size: tuple[int, int]):
+        self.w, self.h = size
+        n = self.w * self.h
+        self._unreached = array('i', [UNREACHED]) * n
+        self._queue = array('i', bytes(4 * n))
+        self.distance = array('i', self._unreached)
+        self.previous = None
+
+    def index(self, x: int, y: int):
+        return y * self.w + x
+
+    def run(self, walls: bytes | bytearray, start: int, track_previous: bool = False):
+        """
+        Distances from `start` to every cell, `walls[cell]` is non-zero for blocked cells.
+        With `track_previous`, `previous[cell]` is the cell it was reached from (`-1` for start and unreached).
+        """
+        w, n = self.w, self.w * self.h
+        dist = self.distance
+        dist[:] = self._unreached
+        previous = None
+        if track_previous:
+            previous = self.previous = array('i', self._unreached)
+        queue = self._queue
+
+        if walls[start]:
+            return self
+        dist[start] = 0
+        queue[0] = start
+        head, tail = 0, 1
+        while head < tail:
+            cell = queue[head]
+            head += 1
+            d = dist[cell] + 1
+            x = cell % w
+            for (ok, nxt) in ((x + 1 < w, cell + 1), (cell + w < n, cell + w),
+                              (x > 0, cell - 1), (cell >= w, cell - w)):
+                if ok and dist[nxt] == UNREACHED and not walls[nxt]:
+                    dist[nxt] = d
+                    queue[tail] = nxt
+                    tail += 1
+                    if previous is not None:
+                        previous[nxt] = cell
+        return self
+
+    def distance_at(self, x: int, y: int):
+        return self.distance[y * self.w + x]
+
+    def path_to(self, cell: int):
+        """
+        Cells from start to `cell`, needs a run with `track_previous`.
+        """
+        assert self.previous is not None, "run(track_previous=True) first"
+        if self.distance[cell] == UNREACHED:
+            return []
+        path = [cell]
+        while (cell := self.previous[cell]) != UNREACHED:
+            path.append(cell)
+        return path[::-1]
+
+    def as_numpy(self):
+        """
+        The distance field as a `(h, w)` int32 view, no copy: it changes with the next `run`.
+        """
+        return np.frombuffer(self.distance, dtype=np.int32).reshape(self.h, self.w)
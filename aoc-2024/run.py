@@ -0,0 +1,284 @@
+"""
+Run every day's `solve.py` in a single process and report per-part results.
+
+A day with a `parts(argv)` entry point (its own command line, without the program name) yields
+`(part, answer)` one part at a time, so the time (and traced peak memory) of each part is its own `next()`.
+Other days are run through `main()` with a patched `sys.argv`: their `p1`/`part1`/`Part 1` lines give
+the values, and only the time of the whole day is reported.
+"""
+import argparse
+import contextlib
+import csv
+import importlib
+import io
+import json
+import re
+import shlex
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import ModuleType
+
+ROOT = Path(__file__).resolve().parent
+
+# part1: 11, Part 1: 11, p1 = 11, part 1: 14, p2: 94 (early result)
+RE_PART = re.compile(r'^\s*(?:p|part)\s*(\d)\s*[:=]\s*(.*)$', re.I)
+
+# Days that need extra arguments to solve a real puzzle input.
+PUZZLE_ARGS: dict[int, list[str]] = {
+    14: ['-W', '101', '-H', '103'],
+    18: ['-W', '71', '-H', '71', '-L', '1024'],
+    20: ['--threshold', '100'],
+}
+
+
+class PartResult:
+    day: int
+    part: int
+    value: str | None
+    # None when the day does not time its parts separately.
+    seconds: float | None
+    peak_bytes: int | None
+
+    def __init__(self, day: int, part: int, value: str | None, seconds: float | None = None,
+                 peak_bytes: int | None = None):
+        self.day = day
+        self.part = part
+        self.value = value
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+
+    def as_dict(self):
+        return {
+            'day': self.day,
+            'part': self.part,
+            'value': self.value,
+            'seconds': self.seconds,
+            'peak_bytes': self.peak_bytes,
+        }
+
+
+class DayResult:
+    day: int
+    input_path: Path
+    parts: list[PartResult]
+    seconds: float
+    peak_bytes: int | None
+    error: str | None
+    output: str
+
+    def __init__(self, day: int, input_path: Path):
+        self.day = day
+        self.input_path = input_path
+        self.parts = []
+        self.seconds = 0.0
+        self.peak_bytes = None
+        self.error = None
+        self.output = ''
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def timed_parts(self):
+        return any(part.seconds is not None for part in self.parts)
+
+    def value(self, part: int):
+        for result in self.parts:
+            if result.part == part:
+                return result.value
+        return None
+
+
+def parse_value(text: str):
+    # `part1: distance = 11` -> `11`, `p2: 94 (early result)` -> `94`
+    value = text.rsplit('=', 1)[-1].strip()
+    return re.sub(r'\s*\(.*\)$', '', value)
+
+
+def discover_days(root: Path = ROOT) -> dict[int, Path]:
+    days = {}
+    for path in sorted(root.glob('day-*/solve.py')):
+        if (m := re.fullmatch(r'day-(\d+)', path.parent.name)) is not None:
+            days[int(m.group(1))] = path
+    return days
+
+
+@contextlib.contextmanager
+def import_day(path: Path):
+    """
+    Import a day as `solve`, with its directory first on `sys.path`. That is also how `multiprocessing`
+    workers find the functions of the module, forked or spawned, so only one day is imported at a time.
+    """
+    day_dir = str(path.parent)
+    saved = sys.modules.pop('solve', None)
+    sys.path.insert(0, day_dir)
+    try:
+        yield importlib.import_module('solve')
+    finally:
+        sys.path.remove(day_dir)
+        sys.modules.pop('solve', None)
+        if saved is not None:
+            sys.modules['solve'] = saved
+
+
+def default_input(day_dir: Path, name: str | None):
+    if name:
+        return day_dir / name
+    puzzle = day_dir / 'input.txt'
+    return puzzle if puzzle.exists() else day_dir / 'sample.txt'
+
+
+def default_args(day: int, input_path: Path) -> list[str]:
+    if input_path.name == 'sample.txt':
+        return []
+    return PUZZLE_ARGS.get(day, [])
+
+
+def run_parts(day: int, module: ModuleType, args: list[str], trace_memory: bool, result: DayResult):
+    parts = module.parts(args)
+    while True:
+        if trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            part, value = next(parts)
+        except StopIteration:
+            return
+        finally:
+            end = time.perf_counter()
+            result.seconds += end - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        result.parts.append(PartResult(day, part, None if value is None else str(value), end - start, peak))
+
+
+def run_main(module: ModuleType, args: list[str], result: DayResult):
+    saved_argv = sys.argv
+    sys.argv = [module.__file__, *args]
+    start = time.perf_counter()
+    try:
+        module.main()
+    finally:
+        result.seconds = time.perf_counter() - start
+        sys.argv = saved_argv
+
+
+def scrape_parts(day: int, output: str):
+    values = {}
+    for line in output.splitlines():
+        if (m := RE_PART.match(line)) is not None:
+            # The last one wins, early results come first.
+            values[int(m.group(1))] = parse_value(m.group(2))
+    return [PartResult(day, part, value) for (part, value) in sorted(values.items())]
+
+
+def run_day(day: int, input_path: Path | None = None, argv: list[str] | None = None,
+            trace_memory: bool = False, days: dict[int, Path] | None = None) -> DayResult:
+    days = days or discover_days()
+    path = days[day]
+    input_path = Path(input_path) if input_path else default_input(path.parent, None)
+    if argv is None:
+        argv = default_args(day, input_path)
+    args = [str(input_path), *argv]
+
+    result = DayResult(day, input_path)
+    output = io.StringIO()
+
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        with import_day(path) as module, contextlib.redirect_stdout(output):
+            if hasattr(module, 'parts'):
+                run_parts(day, module, args, trace_memory, result)
+            else:
+                run_main(module, args, result)
+    except SystemExit as ex:
+        if ex.code not in (None, 0):
+            result.error = f'exit code {ex.code}'
+    except Exception as ex:
+        result.error = f'{type(ex).__name__}: {ex}'
+    finally:
+        if trace_memory:
+            result.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    result.output = output.getvalue()
+    if not result.timed_parts:
+        result.parts = scrape_parts(day, result.output)
+    else:
+        result.peak_bytes = max(p.peak_bytes for p in result.parts) if trace_memory else None
+    return result
+
+
+def to_rows(results: list[DayResult]):
+    for result in results:
+        # A row for the whole day when its parts are not timed on their own.
+        if not result.timed_parts:
+            yield {'day': result.day, 'part': None, 'value': None, 'seconds': result.seconds,
+                   'peak_bytes': result.peak_bytes, 'error': result.error}
+        for part in result.parts:
+            yield {**part.as_dict(), 'error': result.error}
+
+
+def write_report(results: list[DayResult], fmt: str, out=sys.stdout):
+    rows = list(to_rows(results))
+    if fmt == 'json':
+        json.dump(rows, out, indent=2)
+        out.write('\n')
+    elif fmt == 'csv':
+        writer = csv.DictWriter(out, fieldnames=['day', 'part', 'value', 'seconds', 'peak_bytes', 'error'])
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        out.write(f'{"day":>3} {"part":>4} {"time (ms)":>12} {"peak (KiB)":>11}  value\n')
+        for row in rows:
+            seconds = '-' if row['seconds'] is None else f'{row["seconds"] * 1000:.3f}'
+            peak = '-' if row['peak_bytes'] is None else f'{row["peak_bytes"] / 1024:.1f}'
+            value = row['value'] or ''
+            if row['error'] is not None:
+                value = f'{value} !! {row["error"]}'
+            out.write(f'{row["day"]:>3} {row["part"] or "-":>4} {seconds:>12} {peak:>11}  {value}\n')
+        total = sum(r.seconds for r in results)
+        out.write(f'total: {total * 1000:.3f} ms\n')
+
+
+def parse_day_args(items: list[str]) -> dict[int, list[str]]:
+    result = {}
+    for item in items:
+        day, _, args = item.partition('=')
+        result[int(day)] = shlex.split(args)
+    return result
+
+
+def main():
+    days = discover_days()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("days", nargs="*", type=int, choices=list(days), metavar="DAY",
+                        help="Days to run (default: all)")
+    parser.add_argument("-i", "--input", help="Input file name inside each day directory (default: input.txt or sample.txt)")
+    parser.add_argument("-a", "--day-args", action="append", default=[], metavar="DAY=ARGS",
+                        help="Extra arguments for a day, e.g. -a '14=-W 101 -H 103'")
+    parser.add_argument("-m", "--memory", action="store_true", help="Trace peak memory (slower)")
+    parser.add_argument("-f", "--format", choices=("table", "csv", "json"), default="table")
+    parser.add_argument("-o", "--output", help="Write the report to a file instead of stdout")
+    args = parser.parse_args()
+
+    day_args = parse_day_args(args.day_args)
+
+    results = []
+    for day in args.days or list(days):
+        input_path = default_input(days[day].parent, args.input)
+        results.append(run_day(day, input_path, day_args.get(day), args.memory, days))
+
+    if args.output:
+        with open(args.output, "w", encoding='utf-8', newline='') as file:
+            write_report(results, args.format, file)
+    else:
+        write_report(results, args.format)
+
+
+if __name__ == "__main__":
+    main()